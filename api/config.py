@@ -14,3 +14,6 @@ LASTFM_API_KEY = os.getenv("LASTFM_API_KEY", "dc93712b39a39ecd05946e10afb25d05")
 
 # Data directory
 DATA_DIR = Path(__file__).parent.parent / "data"
+
+# Persistent Last.fm response cache (kept beside, but not part of, the archive)
+LASTFM_CACHE_PATH = DATA_DIR / "lastfm_cache.db"
@@ -1,13 +1,22 @@
+import heapq
+import re
 import sqlite3
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterator, List, Dict, Set, Optional, Literal
+from typing import Callable, FrozenSet, Iterator, List, Dict, Set, Optional, Literal, Tuple, TypeVar
 from contextlib import contextmanager
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import itemgetter
 from .config import DATA_DIR
 
 # Content type enum
 ContentType = Literal["all", "music", "podcast"]
 
+T = TypeVar("T")
+
 # Known podcast artists/shows (case-insensitive matching)
 PODCAST_ARTISTS = {
     "dear hank & john",
@@ -33,47 +42,60 @@ PODCAST_ARTISTS = {
     "back to work",
 }
 
-# Patterns that indicate podcast content
-PODCAST_PATTERNS = [
+# Columns copied from every monthly database into the consolidated archive.
+# Older files may predate the genre column, so the order is spelled out rather
+# than relying on each file's physical schema.
+PLAY_COLUMNS = ("played_at", "track_id", "track", "artist", "genre", "ms_played")
+
+# Stock SQLite builds cap ATTACH at ten databases per connection.
+MAX_ATTACHED_DATABASES = 10
+
+# Patterns that indicate podcast content (a tuple, since the filter SQL built
+# from it is cached)
+PODCAST_PATTERNS = (
     "podcast",
     "episode",
     ": ep ",
     " ep.",
-]
+)
+
+
+_PODCAST_ARTISTS = frozenset(PODCAST_ARTISTS)
+_PODCAST_PATTERN_RE = re.compile("|".join(map(re.escape, PODCAST_PATTERNS)), re.IGNORECASE)
+# A leading episode number followed by a colon, e.g. "154: Workplace Therapy".
+_NUMBERED_EPISODE_RE = re.compile(r"\d.{0,8}:")
 
 
 def is_podcast(artist: str, track: str = "") -> bool:
     """Determine if a track is likely a podcast based on artist/track name."""
-    artist_lower = artist.lower()
-    track_lower = track.lower()
-
     # Check against known podcast artists
-    if artist_lower in PODCAST_ARTISTS:
+    if artist.lower() in _PODCAST_ARTISTS:
         return True
 
     # Check for podcast patterns in artist name
-    for pattern in PODCAST_PATTERNS:
-        if pattern in artist_lower:
-            return True
-
-    # Check track name for numbered episodes (common podcast pattern)
-    if track and track[0].isdigit() and ":" in track[:10]:
+    if _PODCAST_PATTERN_RE.search(artist):
         return True
 
-    return False
+    # Check track name for numbered episodes (common podcast pattern)
+    return bool(track and _NUMBERED_EPISODE_RE.match(track))
 
 
+@lru_cache(maxsize=16)
 def get_content_filter_sql(content_type: ContentType, artist_col: str = "artist", track_col: str = "track") -> str:
-    """Generate SQL WHERE clause fragment for content type filtering."""
+    """
+    Generate SQL WHERE clause fragment for content type filtering.
+
+    Known shows are looked up in the archive's ``podcast_names`` table
+    (case-insensitive primary key) instead of one LOWER() comparison each.
+    The fragment only depends on the arguments, so it is built once per
+    combination.
+    """
     if content_type == "all":
         return "1=1"
 
-    # Build conditions for podcast detection
-    podcast_conditions = []
-    for artist in PODCAST_ARTISTS:
-        podcast_conditions.append(f"LOWER({artist_col}) = '{artist}'")
+    podcast_conditions = [f"EXISTS (SELECT 1 FROM podcast_names WHERE name = {artist_col})"]
     for pattern in PODCAST_PATTERNS:
-        podcast_conditions.append(f"LOWER({artist_col}) LIKE '%{pattern}%'")
+        podcast_conditions.append(f"{artist_col} LIKE '%{pattern}%'")
 
     podcast_sql = " OR ".join(podcast_conditions)
 
@@ -83,9 +105,54 @@ def get_content_filter_sql(content_type: ContentType, artist_col: str = "artist"
         return f"NOT ({podcast_sql})"
 
 
+def parse_played_at(value: str) -> datetime:
+    """
+    Parse a stored ``played_at`` timestamp into a naive UTC datetime.
+
+    The collector has written both ``...Z`` and ``...+00:00`` suffixes; the
+    UTC suffix is sliced off once and the rest goes to fromisoformat.
+    """
+    if value.endswith("Z"):
+        value = value[:-1]
+    elif value.endswith("+00:00"):
+        value = value[:-6]
+    return datetime.fromisoformat(value)
+
+
+_paths_cache: Tuple[float, List[Path]] = (-1.0, [])
+_paths_lock = threading.Lock()
+
+
 def get_all_db_paths() -> List[Path]:
-    """Get all monthly database files sorted by date."""
-    return sorted(DATA_DIR.glob("history_*.db"))
+    """
+    Get all monthly database files sorted by date.
+
+    The listing is cached against the data directory's modification time,
+    which changes whenever a monthly file is added or removed.
+    """
+    global _paths_cache
+    try:
+        mtime = DATA_DIR.stat().st_mtime
+    except FileNotFoundError:
+        return []
+    with _paths_lock:
+        if _paths_cache[0] != mtime:
+            _paths_cache = (mtime, sorted(DATA_DIR.glob("history_*.db")))
+        return list(_paths_cache[1])
+
+
+def _map_dbs(fn: Callable[[Path], T], db_paths: Optional[List[Path]] = None) -> List[T]:
+    """
+    Call ``fn`` for each monthly database concurrently, preserving path order.
+
+    sqlite3 releases the GIL while SQLite reads, so independent per-file
+    scans overlap instead of running back to back.
+    """
+    paths = get_all_db_paths() if db_paths is None else db_paths
+    if not paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(8, len(paths))) as executor:
+        return list(executor.map(fn, paths))
 
 
 def get_archive_status() -> Dict:
@@ -94,16 +161,17 @@ def get_archive_status() -> Dict:
     first_played_at: Optional[str] = None
     latest_played_at: Optional[str] = None
 
-    for db_path in db_paths:
+    def read_bounds(db_path: Path) -> Optional[sqlite3.Row]:
         with connect(db_path) as conn:
             try:
-                row = conn.execute(
+                return conn.execute(
                     "SELECT MIN(played_at) AS first_played_at, "
                     "MAX(played_at) AS latest_played_at FROM plays"
                 ).fetchone()
             except sqlite3.OperationalError:
-                continue
+                return None
 
+    for row in _map_dbs(read_bounds, db_paths):
         if not row:
             continue
         first_value = row["first_played_at"]
@@ -138,98 +206,213 @@ def connect(db_path: Path) -> Iterator[sqlite3.Connection]:
         conn.close()
 
 
-def query_all_dbs(sql: str, params: tuple = ()) -> List[Dict]:
-    """Run a query across all monthly databases and combine results."""
-    results = []
+_archive_lock = threading.RLock()
+
+
+def _archive_fingerprint() -> Tuple[Tuple[str, int, int], ...]:
+    """Identify the archive contents by monthly file, modification time and size."""
+    fingerprint = []
     for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
+        try:
+            stat = db_path.stat()
+        except FileNotFoundError:
+            continue
+        fingerprint.append((str(db_path), stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
+
+
+def get_archive_version() -> Tuple[Tuple[str, int, int], ...]:
+    """Return a hashable token that changes whenever any monthly database does."""
+    return _archive_fingerprint()
+
+
+def _copy_attached_plays(conn: sqlite3.Connection, alias: str) -> None:
+    """Append one attached month's plays to the consolidated table."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA {alias}.table_info(plays)")}
+    if not columns:
+        return
+    select_list = ", ".join(col if col in columns else "NULL" for col in PLAY_COLUMNS)
+    conn.execute(
+        f"INSERT INTO plays ({', '.join(PLAY_COLUMNS)}) "
+        f"SELECT {select_list} FROM {alias}.plays"
+    )
+
+
+@lru_cache(maxsize=1)
+def _attached_conn(fingerprint: Tuple[Tuple[str, int, int], ...]) -> sqlite3.Connection:
+    """
+    Build one in-memory connection holding every monthly database's plays.
+
+    The monthly files are ATTACHed in batches (SQLite limits how many can be
+    attached at once) and copied into a single ``plays`` table, so aggregators
+    run one statement and let SQLite group and rank in C. The fingerprint keys
+    the cache: a new or updated month rebuilds the archive on the next call.
+    """
+    conn = sqlite3.connect(":memory:", uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(
+        "CREATE TABLE plays (played_at TEXT, track_id TEXT, track TEXT, "
+        "artist TEXT, genre TEXT, ms_played INTEGER)"
+    )
+    # Last consolidated rowid of each copied month, to recover a play's month
+    conn.execute("CREATE TEMP TABLE plays_months (last_rowid INTEGER PRIMARY KEY, month INTEGER)")
+    conn.execute("CREATE TEMP TABLE podcast_names (name TEXT COLLATE NOCASE PRIMARY KEY)")
+    conn.executemany(
+        "INSERT INTO podcast_names (name) VALUES (?)",
+        ((name,) for name in PODCAST_ARTISTS),
+    )
+    paths = [path for path, _, _ in fingerprint]
+    for start in range(0, len(paths), MAX_ATTACHED_DATABASES):
+        aliases = []
+        for offset, db_path in enumerate(paths[start : start + MAX_ATTACHED_DATABASES]):
+            alias = f"m{start + offset}"
             try:
-                rows = conn.execute(sql, params).fetchall()
-                results.extend(dict(row) for row in rows)
+                conn.execute(f"ATTACH DATABASE ? AS {alias}", (f"file:{db_path}?mode=ro",))
             except sqlite3.OperationalError:
                 continue
-    return results
+            aliases.append((start + offset, alias))
+        for month, alias in aliases:
+            try:
+                _copy_attached_plays(conn, alias)
+            except sqlite3.OperationalError:
+                continue
+            # Months are appended in path order, so each one owns the rowids
+            # up to its last; an empty month adds no bound.
+            conn.execute(
+                "INSERT OR IGNORE INTO plays_months (last_rowid, month) "
+                "SELECT MAX(rowid), ? FROM plays HAVING MAX(rowid) IS NOT NULL",
+                (month,),
+            )
+        conn.commit()
+        for _, alias in aliases:
+            conn.execute(f"DETACH DATABASE {alias}")
+    _ensure_indexes(conn)
+    _build_track_stats(conn)
+    _build_search_index(conn)
+    return conn
+
+
+def _ensure_indexes(conn: sqlite3.Connection) -> None:
+    """Index the archive for recency range scans and case-insensitive artist lookups."""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_played_at ON plays(played_at)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_artist_nocase ON plays(artist COLLATE NOCASE)")
+    conn.commit()
+
+
+def _build_track_stats(conn: sqlite3.Connection) -> None:
+    """
+    Aggregate plays per track and content type once per archive build.
+
+    get_all_tracks_with_counts is called several times per playlist request;
+    grouping ~12k tracks out of every play each time dominated its cost.
+    The distinct genre strings ride along in the same pass for get_track_genres.
+    ``month`` is the first monthly file the track appears in, so readers can
+    keep the archive order the per-month scans produced: month, then track id.
+    """
+    conn.execute(
+        f"CREATE TABLE track_stats AS "
+        f"SELECT track_id, podcast, track, artist, play_count, last_played, first_played, genres, "
+        f"(SELECT month FROM plays_months WHERE last_rowid >= first_row "
+        f"ORDER BY last_rowid LIMIT 1) AS month "
+        f"FROM (SELECT track_id, {get_content_filter_sql('podcast')} AS podcast, track, artist, "
+        f"COUNT(*) AS play_count, MAX(played_at) AS last_played, MIN(played_at) AS first_played, "
+        f"GROUP_CONCAT(DISTINCT NULLIF(genre, '')) AS genres, MIN(rowid) AS first_row "
+        f"FROM plays WHERE track_id IS NOT NULL GROUP BY track_id, podcast)"
+    )
+    conn.execute("CREATE INDEX idx_track_stats ON track_stats(track_id)")
+    conn.commit()
+
+
+def _build_search_index(conn: sqlite3.Connection) -> None:
+    """
+    Index track and artist names for substring search.
+
+    The trigram tokenizer keeps LIKE '%query%' semantics (case-insensitive,
+    matches inside words) while answering from an inverted index. Builds of
+    SQLite without FTS5 or the trigram tokenizer simply skip the index.
+    """
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE plays_fts USING fts5("
+            "track, artist, content='plays', content_rowid='rowid', tokenize='trigram')"
+        )
+        conn.execute("INSERT INTO plays_fts(plays_fts) VALUES('rebuild')")
+        conn.commit()
+    except sqlite3.OperationalError:
+        conn.rollback()
+
+
+@contextmanager
+def _archive() -> Iterator[sqlite3.Connection]:
+    """Yield the consolidated archive connection, rebuilding it if a month changed."""
+    with _archive_lock:
+        yield _attached_conn(_archive_fingerprint())
+
+
+def query_all_dbs(sql: str, params: tuple = ()) -> List[Dict]:
+    """Run a query against the consolidated plays of all monthly databases."""
+    with _archive() as conn:
+        return [dict(row) for row in conn.execute(sql, params)]
 
 
 def get_total_plays(content_type: ContentType = "all") -> int:
     """Get total play count across all databases."""
     filter_sql = get_content_filter_sql(content_type)
-    total = 0
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                count = conn.execute(f"SELECT COUNT(*) FROM plays WHERE {filter_sql}").fetchone()[0]
-                total += count
-            except sqlite3.OperationalError:
-                continue
-    return total
+    with _archive() as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM plays WHERE {filter_sql}").fetchone()[0]
 
 
 def get_unique_artists(content_type: ContentType = "all") -> int:
     """Get unique artist count across all databases."""
     filter_sql = get_content_filter_sql(content_type)
-    artists = set()
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(f"SELECT DISTINCT artist FROM plays WHERE {filter_sql}").fetchall()
-                artists.update(row[0] for row in rows)
-            except sqlite3.OperationalError:
-                continue
-    return len(artists)
+    with _archive() as conn:
+        return conn.execute(
+            f"SELECT COUNT(DISTINCT artist) FROM plays WHERE {filter_sql}"
+        ).fetchone()[0]
 
 
 def get_unique_tracks(content_type: ContentType = "all") -> int:
     """Get unique track count across all databases."""
     filter_sql = get_content_filter_sql(content_type)
-    tracks = set()
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(f"SELECT DISTINCT track_id FROM plays WHERE track_id IS NOT NULL AND {filter_sql}").fetchall()
-                tracks.update(row[0] for row in rows if row[0])
-            except sqlite3.OperationalError:
-                continue
-    return len(tracks)
+    with _archive() as conn:
+        return conn.execute(
+            f"SELECT COUNT(DISTINCT track_id) FROM plays WHERE track_id != '' AND {filter_sql}"
+        ).fetchone()[0]
 
 
 def get_top_artists(limit: int = 20, content_type: ContentType = "all") -> List[Dict]:
     """Get top artists by play count across all databases."""
     filter_sql = get_content_filter_sql(content_type)
-    artist_counts: Dict[str, int] = {}
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT artist, COUNT(*) as count FROM plays WHERE {filter_sql} GROUP BY artist"
-                ).fetchall()
-                for row in rows:
-                    artist_counts[row["artist"]] = artist_counts.get(row["artist"], 0) + row["count"]
-            except sqlite3.OperationalError:
-                continue
-
-    sorted_artists = sorted(artist_counts.items(), key=lambda x: x[1], reverse=True)
-    return [{"artist": a, "play_count": c} for a, c in sorted_artists[:limit]]
+    with _archive() as conn:
+        rows = conn.execute(
+            f"SELECT artist, COUNT(*) AS play_count FROM plays WHERE {filter_sql} "
+            f"GROUP BY artist ORDER BY play_count DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [{"artist": row["artist"], "play_count": row["play_count"]} for row in rows]
 
 
 def get_top_genres(limit: int = 20, content_type: ContentType = "all") -> List[Dict]:
     """Get top genres by play count across all databases."""
     filter_sql = get_content_filter_sql(content_type)
-    genre_counts: Dict[str, int] = {}
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(f"SELECT genre FROM plays WHERE genre != '' AND {filter_sql}").fetchall()
-                for row in rows:
-                    for genre in row["genre"].split(", "):
-                        genre = genre.strip()
-                        if genre:
-                            genre_counts[genre] = genre_counts.get(genre, 0) + 1
-            except sqlite3.OperationalError:
-                continue
-
-    sorted_genres = sorted(genre_counts.items(), key=lambda x: x[1], reverse=True)
-    return [{"genre": g, "play_count": c} for g, c in sorted_genres[:limit]]
+    # Genres are stored as one comma-separated string per play. Collapse
+    # identical strings first, then split the much smaller set of distinct
+    # strings with a recursive CTE so SQLite does the per-genre counting.
+    with _archive() as conn:
+        rows = conn.execute(
+            f"WITH RECURSIVE grouped(genres, hits) AS ("
+            f"SELECT genre, COUNT(*) FROM plays WHERE genre != '' AND {filter_sql} GROUP BY genre"
+            f"), split(genre, rest, hits) AS ("
+            f"SELECT '', genres || ',', hits FROM grouped "
+            f"UNION ALL "
+            f"SELECT TRIM(SUBSTR(rest, 1, INSTR(rest, ',') - 1)), SUBSTR(rest, INSTR(rest, ',') + 1), hits "
+            f"FROM split WHERE rest != '') "
+            f"SELECT genre, SUM(hits) AS play_count FROM split WHERE genre != '' "
+            f"GROUP BY genre ORDER BY play_count DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [{"genre": row["genre"], "play_count": row["play_count"]} for row in rows]
 
 
 def get_track_history(track_id: str) -> List[Dict]:
@@ -240,52 +423,132 @@ def get_track_history(track_id: str) -> List[Dict]:
     )
 
 
-def get_all_tracks_with_counts(content_type: ContentType = "all") -> Dict[str, Dict]:
-    """Get all tracks with their play counts and metadata."""
-    filter_sql = get_content_filter_sql(content_type)
-    tracks: Dict[str, Dict] = {}
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT track_id, track, artist, COUNT(*) as count, "
-                    f"MAX(played_at) as last_played, MIN(played_at) as first_played "
-                    f"FROM plays WHERE track_id IS NOT NULL AND {filter_sql} GROUP BY track_id"
-                ).fetchall()
-                for row in rows:
-                    tid = row["track_id"]
-                    if tid in tracks:
-                        tracks[tid]["play_count"] += row["count"]
-                        if row["last_played"] > tracks[tid]["last_played"]:
-                            tracks[tid]["last_played"] = row["last_played"]
-                        if row["first_played"] < tracks[tid]["first_played"]:
-                            tracks[tid]["first_played"] = row["first_played"]
-                    else:
-                        tracks[tid] = {
-                            "track_id": tid,
-                            "track": row["track"],
-                            "artist": row["artist"],
-                            "play_count": row["count"],
-                            "last_played": row["last_played"],
-                            "first_played": row["first_played"],
-                        }
-            except sqlite3.OperationalError:
-                continue
-    return tracks
+_TRACK_COLUMNS = ("track_id", "track", "artist", "play_count", "last_played", "first_played")
+
+
+def get_all_tracks_with_counts(
+    content_type: ContentType = "all",
+    min_plays: int = 0,
+    played_since: Optional[str] = None,
+) -> Dict[str, Dict]:
+    """
+    Get all tracks with their play counts and metadata.
+
+    ``min_plays`` and ``played_since`` (an ISO-8601 UTC prefix compared
+    against ``last_played``) drop inactive tracks before any dicts are built.
+    Rows are cached per archive version; every call gets its own dicts.
+    """
+    rows = _track_rows(_archive_fingerprint(), content_type)
+    if min_plays:
+        rows = [row for row in rows if row[3] >= min_plays]
+    if played_since is not None:
+        rows = [row for row in rows if row[4] is not None and row[4] >= played_since]
+    return {row[0]: dict(zip(_TRACK_COLUMNS, row)) for row in rows}
+
+
+@lru_cache(maxsize=3)
+def _track_rows(
+    fingerprint: Tuple[Tuple[str, int, int], ...], content_type: ContentType
+) -> Tuple[tuple, ...]:
+    if content_type == "all":
+        # A track can have plays on both sides of the content filter.
+        sql = (
+            "SELECT track_id, track, artist, SUM(play_count) AS play_count, "
+            "MAX(last_played) AS last_played, MIN(first_played) AS first_played "
+            "FROM track_stats GROUP BY track_id ORDER BY MIN(month), track_id"
+        )
+    else:
+        sql = (
+            "SELECT track_id, track, artist, play_count, last_played, first_played "
+            f"FROM track_stats WHERE podcast = {int(content_type == 'podcast')} "
+            "ORDER BY month, track_id"
+        )
+    with _archive_lock:
+        # Plain tuples: immutable, so the cached rows can be shared safely
+        cursor = _attached_conn(fingerprint).cursor()
+        cursor.row_factory = None
+        return tuple(cursor.execute(sql).fetchall())
+
+
+def get_known_first_artists(content_type: ContentType = "all") -> FrozenSet[str]:
+    """
+    Get the lowercased first credited artist of every archived track.
+
+    Discovery uses this to tell new artists from known ones; it is cached
+    per archive version alongside the track rows.
+    """
+    return _known_first_artists(_archive_fingerprint(), content_type)
+
+
+@lru_cache(maxsize=3)
+def _known_first_artists(
+    fingerprint: Tuple[Tuple[str, int, int], ...], content_type: ContentType
+) -> FrozenSet[str]:
+    return frozenset(
+        row[2].lower().split(",", 1)[0].strip() for row in _track_rows(fingerprint, content_type)
+    )
 
 
 def get_all_artist_ids(content_type: ContentType = "all") -> Set[str]:
     """Get all unique artist names (for filtering recommendations)."""
     filter_sql = get_content_filter_sql(content_type)
-    artist_names: Set[str] = set()
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(f"SELECT DISTINCT artist FROM plays WHERE {filter_sql}").fetchall()
-                artist_names.update(row[0] for row in rows)
-            except sqlite3.OperationalError:
-                continue
-    return artist_names
+    with _archive() as conn:
+        return {artist for (artist,) in conn.execute(f"SELECT DISTINCT artist FROM plays WHERE {filter_sql}")}
+
+
+def get_track_genres() -> Dict[str, FrozenSet[str]]:
+    """
+    Map each track ID to its lowercased genres.
+
+    The map is rebuilt only when the archive changes, so back-to-back
+    playlist requests share it. Callers must not mutate the result.
+    """
+    return _track_genres(_archive_fingerprint())
+
+
+@lru_cache(maxsize=1)
+def _track_genres(fingerprint: Tuple[Tuple[str, int, int], ...]) -> Dict[str, FrozenSet[str]]:
+    genres: Dict[str, Set[str]] = {}
+    with _archive_lock:
+        rows = _attached_conn(fingerprint).execute(
+            "SELECT track_id, genres FROM track_stats WHERE genres IS NOT NULL"
+        ).fetchall()
+    for track_id, genre_str in rows:
+        if not track_id or not genre_str:
+            continue
+        track_set = genres.setdefault(track_id, set())
+        # GROUP_CONCAT joins the per-play ", "-separated lists with a bare comma
+        for genre in genre_str.split(","):
+            genre = genre.strip()
+            if genre:
+                track_set.add(genre.lower())
+    return {track_id: frozenset(track_set) for track_id, track_set in genres.items()}
+
+
+def get_track_genre_bits() -> Tuple[Dict[str, int], Dict[str, int]]:
+    """
+    Encode each track's genres as a bitmask over the archive's genre vocabulary.
+
+    Returns ``(genre_bits, track_bits)``: the bit assigned to each lowercased
+    genre, and each track ID's OR of its genres' bits. A genre filter then
+    becomes one mask and a single ``&`` per track. Cached like
+    get_track_genres; callers must not mutate the result.
+    """
+    return _track_genre_bits(_archive_fingerprint())
+
+
+@lru_cache(maxsize=1)
+def _track_genre_bits(
+    fingerprint: Tuple[Tuple[str, int, int], ...]
+) -> Tuple[Dict[str, int], Dict[str, int]]:
+    genre_bits: Dict[str, int] = {}
+    track_bits: Dict[str, int] = {}
+    for track_id, genres in _track_genres(fingerprint).items():
+        mask = 0
+        for genre in genres:
+            mask |= genre_bits.setdefault(genre, 1 << len(genre_bits))
+        track_bits[track_id] = mask
+    return genre_bits, track_bits
 
 
 # Podcast-specific queries
@@ -295,43 +558,42 @@ def get_top_podcasts(limit: int = 20) -> List[Dict]:
 
 
 def get_podcast_episodes(show: str, limit: int = 50) -> List[Dict]:
-    """Get episodes for a specific podcast show."""
-    episodes = []
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    "SELECT track as episode, COUNT(*) as play_count, MAX(played_at) as last_played "
-                    "FROM plays WHERE LOWER(artist) = LOWER(?) GROUP BY track ORDER BY last_played DESC",
-                    (show,)
-                ).fetchall()
-                for row in rows:
-                    episodes.append(dict(row))
-            except sqlite3.OperationalError:
-                continue
-
-    # Dedupe and sort
-    seen = set()
-    unique = []
-    for ep in sorted(episodes, key=lambda x: x["last_played"], reverse=True):
-        if ep["episode"] not in seen:
-            seen.add(ep["episode"])
-            unique.append(ep)
-    return unique[:limit]
+    """Get episodes for a specific podcast show, most recently played first."""
+    with _archive() as conn:
+        return [
+            dict(row)
+            for row in conn.execute(
+                "SELECT track as episode, COUNT(*) as play_count, MAX(played_at) as last_played "
+                "FROM plays WHERE artist = ? COLLATE NOCASE "
+                "GROUP BY track ORDER BY last_played DESC LIMIT ?",
+                (show, limit)
+            )
+        ]
 
 
 def get_listening_stats_by_type() -> Dict[str, Dict]:
     """Get listening stats broken down by content type."""
+    podcast_sql = get_content_filter_sql("podcast")
+    with _archive() as conn:
+        rows = conn.execute(
+            f"SELECT CASE WHEN {podcast_sql} THEN 'podcast' ELSE 'music' END AS content_type, "
+            f"COUNT(*) AS total_plays, COUNT(DISTINCT artist) AS unique_artists, "
+            f"COUNT(DISTINCT NULLIF(track_id, '')) AS unique_tracks "
+            f"FROM plays GROUP BY content_type"
+        ).fetchall()
+    by_type = {row["content_type"]: row for row in rows}
+    music = by_type.get("music")
+    podcast = by_type.get("podcast")
     return {
         "music": {
-            "total_plays": get_total_plays("music"),
-            "unique_artists": get_unique_artists("music"),
-            "unique_tracks": get_unique_tracks("music"),
+            "total_plays": music["total_plays"] if music else 0,
+            "unique_artists": music["unique_artists"] if music else 0,
+            "unique_tracks": music["unique_tracks"] if music else 0,
         },
         "podcast": {
-            "total_plays": get_total_plays("podcast"),
-            "unique_shows": get_unique_artists("podcast"),
-            "unique_episodes": get_unique_tracks("podcast"),
+            "total_plays": podcast["total_plays"] if podcast else 0,
+            "unique_shows": podcast["unique_artists"] if podcast else 0,
+            "unique_episodes": podcast["unique_tracks"] if podcast else 0,
         },
     }
 
@@ -339,48 +601,54 @@ def get_listening_stats_by_type() -> Dict[str, Dict]:
 def get_all_plays_with_timestamps(content_type: ContentType = "all") -> List[str]:
     """Get all play timestamps for pattern analysis."""
     filter_sql = get_content_filter_sql(content_type)
-    timestamps = []
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT played_at FROM plays WHERE {filter_sql}"
-                ).fetchall()
-                timestamps.extend(row[0] for row in rows if row[0])
-            except sqlite3.OperationalError:
-                continue
-    return timestamps
+    with _archive() as conn:
+        return [t for (t,) in conn.execute(f"SELECT played_at FROM plays WHERE {filter_sql}") if t]
 
 
-def get_top_tracks(limit: int = 20, content_type: ContentType = "all") -> List[Dict]:
-    """Get top tracks by play count across all databases."""
+def get_play_counts_by_hour(content_type: ContentType = "all") -> List[Tuple[str, str, int]]:
+    """
+    Count plays per calendar day and hour for pattern analysis.
+
+    Returns ``(YYYY-MM-DD, HH, plays)`` tuples taken straight from the stored
+    timestamps' wall-clock fields, so a few thousand buckets cross into Python
+    instead of every play.
+    """
+    filter_sql = get_content_filter_sql(content_type)
+    with _archive() as conn:
+        return [
+            tuple(row)
+            for row in conn.execute(
+                f"SELECT substr(played_at, 1, 10) AS day, substr(played_at, 12, 2) AS hour, "
+                f"COUNT(*) AS plays FROM plays WHERE played_at IS NOT NULL AND {filter_sql} "
+                f"GROUP BY day, hour"
+            )
+        ]
+
+
+def get_listening_days(content_type: ContentType = "all") -> List[str]:
+    """Get the distinct ``YYYY-MM-DD`` days with at least one play, oldest first."""
     filter_sql = get_content_filter_sql(content_type)
-    track_data: Dict[str, Dict] = {}
+    with _archive() as conn:
+        return [
+            day
+            for (day,) in conn.execute(
+                f"SELECT DISTINCT substr(played_at, 1, 10) AS day FROM plays "
+                f"WHERE played_at IS NOT NULL AND {filter_sql} ORDER BY day"
+            )
+        ]
 
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT track_id, track, artist, COUNT(*) as count "
-                    f"FROM plays WHERE track_id IS NOT NULL AND {filter_sql} "
-                    f"GROUP BY track_id"
-                ).fetchall()
-                for row in rows:
-                    tid = row["track_id"]
-                    if tid in track_data:
-                        track_data[tid]["play_count"] += row["count"]
-                    else:
-                        track_data[tid] = {
-                            "track_id": tid,
-                            "track": row["track"],
-                            "artist": row["artist"],
-                            "play_count": row["count"],
-                        }
-            except sqlite3.OperationalError:
-                continue
 
-    sorted_tracks = sorted(track_data.values(), key=lambda x: x["play_count"], reverse=True)
-    return sorted_tracks[:limit]
+def get_top_tracks(limit: int = 20, content_type: ContentType = "all") -> List[Dict]:
+    """Get top tracks by play count across all databases."""
+    filter_sql = get_content_filter_sql(content_type)
+    with _archive() as conn:
+        rows = conn.execute(
+            f"SELECT track_id, track, artist, COUNT(*) as play_count "
+            f"FROM plays WHERE track_id IS NOT NULL AND {filter_sql} "
+            f"GROUP BY track_id ORDER BY play_count DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+    return [dict(row) for row in rows]
 
 
 def get_recent_listening(days: int = 30, content_type: ContentType = "music") -> Dict:
@@ -393,56 +661,45 @@ def get_recent_listening(days: int = 30, content_type: ContentType = "music") ->
     cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
     filter_sql = get_content_filter_sql(content_type)
 
-    artists: Dict[str, int] = {}
+    artists: Counter = Counter()
     tracks: Dict[str, Dict] = {}
-    genres: Dict[str, int] = {}
-
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT track_id, track, artist, genre, played_at FROM plays "
-                    f"WHERE played_at > ? AND {filter_sql}",
-                    (cutoff,)
-                ).fetchall()
-
-                for row in rows:
-                    # Count artists
-                    artist = row["artist"].split(",")[0].strip()
-                    artists[artist] = artists.get(artist, 0) + 1
-
-                    # Count tracks
-                    tid = row["track_id"]
-                    if tid:
-                        if tid not in tracks:
-                            tracks[tid] = {
-                                "track_id": tid,
-                                "track": row["track"],
-                                "artist": row["artist"],
-                                "play_count": 0,
-                            }
-                        tracks[tid]["play_count"] += 1
-
-                    # Count genres
-                    if row["genre"]:
-                        for g in row["genre"].split(", "):
-                            g = g.strip()
-                            if g:
-                                genres[g] = genres.get(g, 0) + 1
-
-            except sqlite3.OperationalError:
-                continue
+    genres: Counter = Counter()
+
+    with _archive() as conn:
+        rows = conn.execute(
+            f"SELECT track_id, track, artist, genre, played_at FROM plays "
+            f"WHERE played_at > ? AND {filter_sql}",
+            (cutoff,)
+        ).fetchall()
+
+    for row in rows:
+        # Count artists
+        artists[row["artist"].split(",")[0].strip()] += 1
+
+        # Count tracks
+        tid = row["track_id"]
+        if tid:
+            if tid not in tracks:
+                tracks[tid] = {
+                    "track_id": tid,
+                    "track": row["track"],
+                    "artist": row["artist"],
+                    "play_count": 0,
+                }
+            tracks[tid]["play_count"] += 1
+
+        # Count genres
+        if row["genre"]:
+            genres.update(g for g in (g.strip() for g in row["genre"].split(", ")) if g)
 
     # Sort by play count
-    sorted_artists = sorted(artists.items(), key=lambda x: x[1], reverse=True)
     sorted_tracks = sorted(tracks.values(), key=lambda x: x["play_count"], reverse=True)
-    sorted_genres = sorted(genres.items(), key=lambda x: x[1], reverse=True)
 
     return {
-        "artists": [{"artist": a, "play_count": c} for a, c in sorted_artists],
+        "artists": [{"artist": a, "play_count": c} for a, c in artists.most_common()],
         "tracks": sorted_tracks,
-        "genres": [{"genre": g, "play_count": c} for g, c in sorted_genres],
-        "total_plays": sum(artists.values()),
+        "genres": [{"genre": g, "play_count": c} for g, c in genres.most_common()],
+        "total_plays": len(rows),
     }
 
 
@@ -454,35 +711,32 @@ def search_user_tracks(query: str, limit: int = 20) -> List[Dict]:
     Returns tracks sorted by play count.
     """
     query_lower = query.lower()
-    results: Dict[str, Dict] = {}
 
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    "SELECT track_id, track, artist, COUNT(*) as count "
-                    "FROM plays WHERE track_id IS NOT NULL "
-                    "AND (LOWER(track) LIKE ? OR LOWER(artist) LIKE ?) "
-                    "GROUP BY track_id",
-                    (f"%{query_lower}%", f"%{query_lower}%")
-                ).fetchall()
-
-                for row in rows:
-                    tid = row["track_id"]
-                    if tid in results:
-                        results[tid]["play_count"] += row["count"]
-                    else:
-                        results[tid] = {
-                            "track_id": tid,
-                            "track": row["track"],
-                            "artist": row["artist"],
-                            "play_count": row["count"],
-                        }
-            except sqlite3.OperationalError:
-                continue
-
-    sorted_results = sorted(results.values(), key=lambda x: x["play_count"], reverse=True)
-    return sorted_results[:limit]
+    with _archive() as conn:
+        has_index = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'plays_fts'"
+        ).fetchone()
+        # Trigrams need at least three characters; shorter queries scan.
+        # LIKE already folds ASCII case, so the columns need no LOWER() and
+        # the lowercased pattern keeps the old non-ASCII behaviour.
+        if has_index and len(query) >= 3:
+            rows = conn.execute(
+                "SELECT track_id, track, artist, COUNT(*) as play_count "
+                "FROM plays WHERE track_id IS NOT NULL "
+                "AND rowid IN (SELECT rowid FROM plays_fts WHERE plays_fts MATCH ?) "
+                "GROUP BY track_id",
+                ('"' + query.replace('"', '""') + '"',)
+            ).fetchall()
+        else:
+            rows = conn.execute(
+                "SELECT track_id, track, artist, COUNT(*) as play_count "
+                "FROM plays WHERE track_id IS NOT NULL "
+                "AND (track LIKE :q OR artist LIKE :q) "
+                "GROUP BY track_id",
+                {"q": f"%{query_lower}%"}
+            ).fetchall()
+
+    return heapq.nlargest(limit, (dict(row) for row in rows), key=itemgetter("play_count"))
 
 
 def get_recent_tracks(days: int = 7, limit: int = 20, content_type: ContentType = "music") -> List[Dict]:
@@ -497,30 +751,25 @@ def get_recent_tracks(days: int = 7, limit: int = 20, content_type: ContentType
     filter_sql = get_content_filter_sql(content_type)
     tracks: Dict[str, Dict] = {}
 
-    for db_path in get_all_db_paths():
-        with connect(db_path) as conn:
-            try:
-                rows = conn.execute(
-                    f"SELECT track_id, track, artist, played_at "
-                    f"FROM plays WHERE track_id IS NOT NULL "
-                    f"AND played_at > ? AND {filter_sql} "
-                    f"ORDER BY played_at DESC",
-                    (cutoff,)
-                ).fetchall()
-
-                for row in rows:
-                    tid = row["track_id"]
-                    if tid not in tracks:
-                        tracks[tid] = {
-                            "track_id": tid,
-                            "track": row["track"],
-                            "artist": row["artist"],
-                            "last_played": row["played_at"],
-                            "play_count": 0,
-                        }
-                    tracks[tid]["play_count"] += 1
-            except sqlite3.OperationalError:
-                continue
-
-    sorted_tracks = sorted(tracks.values(), key=lambda x: x["last_played"], reverse=True)
-    return sorted_tracks[:limit]
+    with _archive() as conn:
+        rows = conn.execute(
+            f"SELECT track_id, track, artist, played_at "
+            f"FROM plays WHERE track_id IS NOT NULL "
+            f"AND played_at > ? AND {filter_sql} "
+            f"ORDER BY played_at DESC",
+            (cutoff,)
+        ).fetchall()
+
+    for row in rows:
+        tid = row["track_id"]
+        if tid not in tracks:
+            tracks[tid] = {
+                "track_id": tid,
+                "track": row["track"],
+                "artist": row["artist"],
+                "last_played": row["played_at"],
+                "play_count": 0,
+            }
+        tracks[tid]["play_count"] += 1
+
+    return heapq.nlargest(limit, tracks.values(), key=itemgetter("last_played"))
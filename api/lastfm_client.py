@@ -4,14 +4,147 @@ Last.fm API client for similar artists discovery.
 Used as fallback since Spotify's Related Artists API is restricted.
 """
 
+import json
+import sqlite3
+import threading
+import time
 import requests
-from typing import List, Dict, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Callable, List, Dict, Optional, Tuple
 from functools import lru_cache
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from .config import LASTFM_API_KEY
+from .config import LASTFM_API_KEY, LASTFM_CACHE_PATH
+
+# orjson parses the larger track.getsimilar payloads several times faster when
+# it is installed; the stdlib parser returns the same shapes otherwise.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
 
 LASTFM_API_BASE = "https://ws.audioscrobbler.com/2.0/"
 
+# One pooled keep-alive session for every Last.fm call, so parallel batches
+# reuse TCP/TLS connections instead of handshaking per request.
+_POOL_SIZE = 32
+_SESSION = requests.Session()
+_SESSION.headers["User-Agent"] = "SpotifyHistoryPlaylistMaker/1.0"
+_SESSION.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=_POOL_SIZE,
+        pool_maxsize=_POOL_SIZE,
+        # Read timeouts are not retried, and a 429's Retry-After is not
+        # honoured, so one slow call cannot stall a batch past its timeout
+        max_retries=Retry(
+            total=3,
+            read=0,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            respect_retry_after_header=False,
+        ),
+    ),
+)
+_BASE_PARAMS = {"api_key": LASTFM_API_KEY, "format": "json"}
+
+
+def _lastfm_get(method: str, **params) -> Dict:
+    """Call one Last.fm API method over the shared session and return its JSON."""
+    response = _SESSION.get(
+        LASTFM_API_BASE,
+        params={"method": method, **params, **_BASE_PARAMS},
+        timeout=10,
+    )
+    response.raise_for_status()
+    data = _json_loads(response.content)
+    # Last.fm reports failures (unknown artist, rate limit, bad key) as an
+    # error body, sometimes with a 2xx status; never treat one as a result.
+    if "error" in data:
+        raise RuntimeError(f"Last.fm error {data['error']}: {data.get('message', '')}")
+    return data
+
+
+# Last.fm's similarity graph changes slowly, so normalized responses are kept
+# on disk across restarts underneath the in-process lru_caches.
+LASTFM_CACHE_TTL = 30 * 86400
+# An empty result may just be a Last.fm hiccup, so it is retried much sooner.
+LASTFM_EMPTY_CACHE_TTL = 86400
+
+_cache_conn: Optional[sqlite3.Connection] = None
+_cache_lock = threading.Lock()
+
+# Per-key locks so concurrent callers asking for the same lookup (overlapping
+# playlist jobs, or an lru_cache miss racing itself) share one network call.
+# Each entry counts the callers holding or waiting for its lock and is dropped
+# when the last one leaves.
+_inflight: Dict[str, List] = {}
+_inflight_lock = threading.Lock()
+
+
+def _cache_db() -> sqlite3.Connection:
+    global _cache_conn
+    if _cache_conn is None:
+        conn = sqlite3.connect(LASTFM_CACHE_PATH, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, fetched_at INTEGER, payload BLOB)"
+        )
+        _cache_conn = conn
+    return _cache_conn
+
+
+def _persisted(key: str, loader: Callable[[], List[Dict]]) -> List[Dict]:
+    """
+    Return a fresh persisted result for key, or call loader and store it.
+
+    Loader exceptions propagate without being cached. An unusable cache file
+    only costs the lookup; the request still goes to Last.fm. Concurrent
+    callers for the same key wait for the first one and then read its result
+    from the cache.
+    """
+    with _inflight_lock:
+        entry = _inflight.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            return _load_or_fetch(key, loader)
+    finally:
+        with _inflight_lock:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _inflight[key]
+
+
+def _load_or_fetch(key: str, loader: Callable[[], List[Dict]]) -> List[Dict]:
+    now = int(time.time())
+    try:
+        with _cache_lock:
+            row = _cache_db().execute(
+                "SELECT fetched_at, payload FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row:
+            cached = _json_loads(row[1])
+            ttl = LASTFM_CACHE_TTL if cached else LASTFM_EMPTY_CACHE_TTL
+            if now - row[0] < ttl:
+                return cached
+    except (sqlite3.Error, ValueError):
+        pass
+
+    results = loader()
+    try:
+        with _cache_lock:
+            conn = _cache_db()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, fetched_at, payload) VALUES (?, ?, ?)",
+                (key, now, json.dumps(results)),
+            )
+            conn.commit()
+    except sqlite3.Error:
+        pass
+    return results
+
 
 @lru_cache(maxsize=2000)
 def get_similar_tracks(artist: str, track: str, limit: int = 100) -> List[Dict]:
@@ -19,27 +152,13 @@ def get_similar_tracks(artist: str, track: str, limit: int = 100) -> List[Dict]:
     Get tracks similar to the given track using Last.fm API.
 
     Returns list of dicts with: artist, name, match (0-1 similarity score)
-    Results are cached to avoid repeated API calls.
+    Results are cached in memory and on disk to avoid repeated API calls.
     """
     if not artist or not track or not LASTFM_API_KEY:
         return []
 
-    try:
-        response = requests.get(
-            LASTFM_API_BASE,
-            params={
-                "method": "track.getsimilar",
-                "artist": artist,
-                "track": track,
-                "api_key": LASTFM_API_KEY,
-                "format": "json",
-                "limit": limit,
-            },
-            timeout=10,
-            headers={"User-Agent": "SpotifyHistoryPlaylistMaker/1.0"},
-        )
-        response.raise_for_status()
-        data = response.json()
+    def fetch() -> List[Dict]:
+        data = _lastfm_get("track.getsimilar", artist=artist, track=track, limit=limit)
 
         similar = data.get("similartracks", {}).get("track", [])
 
@@ -55,6 +174,8 @@ def get_similar_tracks(artist: str, track: str, limit: int = 100) -> List[Dict]:
 
         return results
 
+    try:
+        return _persisted(json.dumps(["track.getsimilar", artist, track, limit]), fetch)
     except Exception as e:
         print(f"Last.fm track.getSimilar error: {type(e).__name__}")
         return []
@@ -66,26 +187,13 @@ def get_similar_artists(artist_name: str, limit: int = 20) -> List[Dict]:
     Get artists similar to the given artist using Last.fm API.
 
     Returns list of dicts with: name, match (0-1 similarity score), url
-    Results are cached to avoid repeated API calls.
+    Results are cached in memory and on disk to avoid repeated API calls.
     """
     if not artist_name or not LASTFM_API_KEY:
         return []
 
-    try:
-        response = requests.get(
-            LASTFM_API_BASE,
-            params={
-                "method": "artist.getsimilar",
-                "artist": artist_name,
-                "api_key": LASTFM_API_KEY,
-                "format": "json",
-                "limit": limit,
-            },
-            timeout=10,
-            headers={"User-Agent": "SpotifyHistoryPlaylistMaker/1.0"},
-        )
-        response.raise_for_status()
-        data = response.json()
+    def fetch() -> List[Dict]:
+        data = _lastfm_get("artist.getsimilar", artist=artist_name, limit=limit)
 
         similar = data.get("similarartists", {}).get("artist", [])
 
@@ -101,6 +209,8 @@ def get_similar_artists(artist_name: str, limit: int = 20) -> List[Dict]:
 
         return results
 
+    try:
+        return _persisted(json.dumps(["artist.getsimilar", artist_name, limit]), fetch)
     except Exception as e:
         print(f"Last.fm artist lookup error: {type(e).__name__}")
         return []
@@ -123,13 +233,25 @@ def get_similar_tracks_batch(
         Dict mapping (artist, track) to list of similar tracks
     """
     results = {}
+    # Duplicate pairs would only queue behind the same cached lookup, and
+    # threads beyond the session's connection pool would just wait for a
+    # socket, so size the fan-out to the distinct work actually requested.
+    unique_tracks = list(dict.fromkeys(tracks))
+    if not unique_tracks:
+        return results
 
     def fetch_one(track_tuple):
         artist, track = track_tuple
         return track_tuple, get_similar_tracks(artist, track, limit)
 
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [executor.submit(fetch_one, t) for t in tracks]
+    if len(unique_tracks) == 1:
+        key, similar = fetch_one(unique_tracks[0])
+        results[key] = similar
+        return results
+
+    workers = min(max_workers, len(unique_tracks), _POOL_SIZE)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(fetch_one, t) for t in unique_tracks]
         for future in as_completed(futures):
             try:
                 key, similar = future.result()
@@ -150,19 +272,7 @@ def get_artist_info(artist_name: str) -> Optional[Dict]:
         return None
 
     try:
-        response = requests.get(
-            LASTFM_API_BASE,
-            params={
-                "method": "artist.getinfo",
-                "artist": artist_name,
-                "api_key": LASTFM_API_KEY,
-                "format": "json",
-            },
-            timeout=10,
-            headers={"User-Agent": "SpotifyHistoryPlaylistMaker/1.0"},
-        )
-        response.raise_for_status()
-        data = response.json()
+        data = _lastfm_get("artist.getinfo", artist=artist_name)
 
         artist = data.get("artist", {})
         tags = artist.get("tags", {}).get("tag", [])
@@ -1,17 +1,23 @@
-from typing import List, Literal, Optional
-from fastapi import FastAPI, HTTPException, Query
+from functools import wraps
+from typing import Dict, List, Literal, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import StreamingResponse
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+from starlette.datastructures import MutableHeaders
+import hashlib
 import json
 import os
 import threading
+import time
 
 from .services.analyzer import (
     get_overview, get_overview_split, get_top_artists_stats, get_top_genres_stats,
     get_listening_patterns, get_listening_streaks
 )
-from .db import get_archive_status, get_top_tracks, search_user_tracks, get_recent_tracks
+from .db import (
+    get_archive_status, get_archive_version, get_top_tracks, search_user_tracks, get_recent_tracks
+)
 from .spotify_client import (
     enrich_tracks_with_spotify_data, create_playlist, search_tracks_advanced
 )
@@ -22,6 +28,10 @@ from .services.podcasts import (
     get_podcast_stats, get_top_shows, get_show_episodes,
     get_recently_played_episodes, get_podcast_backlog
 )
+from .services.custom_playlist import generate_custom_playlist, generate_vibe_playlist
+from .services.frog_playlist import (
+    generate_frog_playlist, generate_frog_playlist_streaming, get_frog_alternatives
+)
 
 app = FastAPI(title="Spotify History Recommendations", version="2.0.0")
 
@@ -50,6 +60,53 @@ app.add_middleware(
 
 ContentTypeParam = Literal["all", "music", "podcast"]
 
+# Read-only GETs whose payload only changes with the archive; the SPA refetches
+# them on every view, so unchanged bodies are answered with 304 Not Modified.
+_ETAG_PATH_PREFIXES = (
+    "/api/stats/",
+    "/api/podcasts/",
+    "/api/recommendations/moods",
+    "/api/meta/status",
+)
+
+
+def _if_none_match(etag: str, header: str) -> bool:
+    """Whether an If-None-Match header matches etag under weak comparison."""
+    opaque = etag.removeprefix("W/")
+    for token in header.split(","):
+        token = token.strip()
+        if token == "*" or token.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+@app.middleware("http")
+async def etag_responses(request: Request, call_next):
+    """Tag deterministic GET responses with a content hash and honour If-None-Match."""
+    response = await call_next(request)
+    if (
+        request.method != "GET"
+        or response.status_code != 200
+        or not request.url.path.startswith(_ETAG_PATH_PREFIXES)
+    ):
+        return response
+
+    body = b"".join([chunk async for chunk in response.body_iterator])
+    etag = f'W/"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+    # MutableHeaders keeps repeated headers (set-cookie, vary) that a dict
+    # would collapse into one
+    headers = MutableHeaders(raw=list(response.raw_headers))
+    headers["etag"] = etag
+    if _if_none_match(etag, request.headers.get("if-none-match", "")):
+        del headers["content-length"]
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=body,
+        status_code=response.status_code,
+        headers=headers,
+        media_type=response.media_type,
+    )
+
 
 def enrich_tracks_if_available(tracks):
     """Add Spotify metadata without making archive features depend on it."""
@@ -68,26 +125,60 @@ def enrich_tracks_if_available(tracks):
         ]
 
 
+# Stats responses only change when a monthly database does, so they are cached
+# against the archive version. The TTL still expires them so date-relative
+# numbers (the current streak) roll over without new plays arriving.
+STATS_CACHE_TTL = 600
+_STATS_CACHE_MAX_ENTRIES = 256
+_stats_cache: Dict[Tuple, Tuple[float, object]] = {}
+_stats_cache_lock = threading.Lock()
+
+
+def cached_stats(endpoint):
+    """Serve repeat stats requests from memory until the archive changes."""
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        key = (endpoint.__name__, args, tuple(sorted(kwargs.items())), get_archive_version())
+        now = time.monotonic()
+        with _stats_cache_lock:
+            cached = _stats_cache.get(key)
+        if cached and now - cached[0] < STATS_CACHE_TTL:
+            return cached[1]
+
+        result = endpoint(*args, **kwargs)
+        with _stats_cache_lock:
+            if len(_stats_cache) >= _STATS_CACHE_MAX_ENTRIES:
+                _stats_cache.clear()
+            _stats_cache[key] = (now, result)
+        return result
+
+    return wrapper
+
+
 # Stats endpoints
 @app.get("/api/stats/overview")
+@cached_stats
 def stats_overview(content_type: ContentTypeParam = "all"):
     """Get listening overview stats."""
     return get_overview(content_type)
 
 
 @app.get("/api/stats/overview/split")
+@cached_stats
 def stats_overview_split():
     """Get listening stats split by music vs podcasts."""
     return get_overview_split()
 
 
 @app.get("/api/stats/artists")
+@cached_stats
 def stats_artists(limit: int = 20, content_type: ContentTypeParam = "all"):
     """Get top artists by play count."""
     return get_top_artists_stats(limit, content_type)
 
 
 @app.get("/api/stats/genres")
+@cached_stats
 def stats_genres(limit: int = 20, content_type: ContentTypeParam = "all"):
     """Get top genres by play count."""
     return get_top_genres_stats(limit, content_type)
@@ -100,12 +191,14 @@ def stats_tracks(limit: int = 20, content_type: ContentTypeParam = "all"):
 
 
 @app.get("/api/stats/patterns")
+@cached_stats
 def stats_patterns(content_type: ContentTypeParam = "all"):
     """Get listening patterns by hour, day, and month."""
     return get_listening_patterns(content_type)
 
 
 @app.get("/api/stats/streaks")
+@cached_stats
 def stats_streaks(content_type: ContentTypeParam = "all"):
     """Get listening streak information."""
     return get_listening_streaks(content_type)
@@ -201,8 +294,6 @@ def recommendations_custom(
     exclude_artists: str = "",
 ):
     """Generate a custom playlist with fine-tuned filters including audio features."""
-    from .services.custom_playlist import generate_custom_playlist
-
     genre_list = [g.strip() for g in genres.split(",") if g.strip()]
     exclude_genre_list = [g.strip() for g in exclude_genres.split(",") if g.strip()]
     exclude_artist_list = [a.strip() for a in exclude_artists.split(",") if a.strip()]
@@ -232,7 +323,13 @@ def recommendations_custom(
 
 
 # Playlist creation
-class CreatePlaylistRequest(BaseModel):
+class RequestModel(BaseModel):
+    """JSON request body; unknown fields are rejected rather than parsed and dropped."""
+
+    model_config = ConfigDict(extra="forbid")
+
+
+class CreatePlaylistRequest(RequestModel):
     name: str
     track_ids: List[str]
     description: str = ""
@@ -263,7 +360,7 @@ def archive_status():
 
 # === NEW VIBE-BASED PLAYLIST ENDPOINTS ===
 
-class VibePlaylistRequest(BaseModel):
+class VibePlaylistRequest(RequestModel):
     anchor_track_ids: List[str]
     track_count: int = 30
     discovery_ratio: int = 50
@@ -283,8 +380,6 @@ def recommendations_vibe(request: VibePlaylistRequest):
     Select 1-5 anchor tracks that define the vibe you want.
     The algorithm finds similar tracks from your history and new discoveries.
     """
-    from .services.custom_playlist import generate_vibe_playlist
-
     if not request.anchor_track_ids:
         raise HTTPException(status_code=400, detail="Need at least 1 anchor track")
     if len(request.anchor_track_ids) > 5:
@@ -309,13 +404,13 @@ def recommendations_vibe(request: VibePlaylistRequest):
 
 # === FROG PLAYLIST (A* PATHFINDING) ===
 
-class FrogPlaylistRequest(BaseModel):
+class FrogPlaylistRequest(RequestModel):
     start_track_id: str
     end_track_id: str
     track_count: int = 20
 
 
-class FrogAlternativesRequest(BaseModel):
+class FrogAlternativesRequest(RequestModel):
     track_ids: List[str]
     position: int
     limit: int = 8
@@ -331,8 +426,6 @@ def recommendations_frog(request: FrogPlaylistRequest):
     Uses A* pathfinding over Last.fm's track similarity graph to find
     the smoothest path between two songs.
     """
-    from .services.frog_playlist import generate_frog_playlist
-
     if not request.start_track_id or not request.end_track_id:
         raise HTTPException(status_code=400, detail="Need both start and end tracks")
 
@@ -372,8 +465,6 @@ def recommendations_frog_stream(request: FrogPlaylistRequest):
 
     Streams progress events during A* search, then final result.
     """
-    from .services.frog_playlist import generate_frog_playlist_streaming
-
     if not request.start_track_id or not request.end_track_id:
         raise HTTPException(status_code=400, detail="Need both start and end tracks")
 
@@ -419,8 +510,6 @@ def recommendations_frog_stream(request: FrogPlaylistRequest):
 @app.post("/api/recommendations/frog/alternatives")
 def recommendations_frog_alternatives(request: FrogAlternativesRequest):
     """Find nearby songs that can replace one bridge without breaking its neighbors."""
-    from .services.frog_playlist import get_frog_alternatives
-
     if len(request.track_ids) < 3 or len(request.track_ids) > 50:
         raise HTTPException(status_code=400, detail="Route must contain 3 to 50 tracks")
     if len(set(request.track_ids)) != len(request.track_ids):
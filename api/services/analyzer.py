@@ -1,10 +1,9 @@
 from typing import List, Dict
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from ..db import (
     get_total_plays, get_unique_artists, get_unique_tracks,
     get_top_artists, get_top_genres, get_listening_stats_by_type,
-    get_all_plays_with_timestamps, ContentType
+    get_listening_days, get_play_counts_by_hour, ContentType
 )
 
 
@@ -37,60 +36,57 @@ def get_listening_patterns(content_type: ContentType = "all") -> Dict:
     Analyze listening patterns by hour of day and day of week.
     Returns data for visualization.
     """
-    plays = get_all_plays_with_timestamps(content_type)
-    
-    # Initialize counters
-    by_hour = defaultdict(int)
-    by_day = defaultdict(int)
-    by_month = defaultdict(int)
+    # Fixed-size counters indexed by hour, weekday and zero-based month
+    by_hour = [0] * 24
+    by_day = [0] * 7
+    by_month = [0] * 12
     
     day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 
                    'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
-    for play in plays:
+    # Plays arrive pre-counted per day and hour, so each date is parsed once
+    for day, hour, count in get_play_counts_by_hour(content_type):
         try:
-            # Parse timestamp
-            ts = play.replace("Z", "").replace("+00:00", "")
-            if "." in ts:
-                dt = datetime.fromisoformat(ts)
-            else:
-                dt = datetime.fromisoformat(ts)
-            
-            by_hour[dt.hour] += 1
-            by_day[dt.weekday()] += 1
-            by_month[dt.month - 1] += 1
-        except (ValueError, AttributeError):
+            d = date.fromisoformat(day)
+            h = int(hour)
+        except (ValueError, TypeError):
+            continue
+        if not 0 <= h < 24:
             continue
+
+        by_hour[h] += count
+        by_day[d.weekday()] += count
+        by_month[d.month - 1] += count
     
     # Format for charts
     hourly_data = [
-        {"hour": h, "label": f"{h:02d}:00", "plays": by_hour.get(h, 0)}
+        {"hour": h, "label": f"{h:02d}:00", "plays": by_hour[h]}
         for h in range(24)
     ]
     
     daily_data = [
-        {"day": d, "label": day_names[d], "plays": by_day.get(d, 0)}
+        {"day": d, "label": day_names[d], "plays": by_day[d]}
         for d in range(7)
     ]
     
     monthly_data = [
-        {"month": m, "label": month_names[m], "plays": by_month.get(m, 0)}
+        {"month": m, "label": month_names[m], "plays": by_month[m]}
         for m in range(12)
     ]
     
-    # Find peak times
-    peak_hour = max(by_hour.items(), key=lambda x: x[1], default=(12, 0))
-    peak_day = max(by_day.items(), key=lambda x: x[1], default=(0, 0))
+    # Find peak times (noon / Monday when there are no plays)
+    peak_hour = max(range(24), key=by_hour.__getitem__) if any(by_hour) else 12
+    peak_day = max(range(7), key=by_day.__getitem__)
     
     return {
         "by_hour": hourly_data,
         "by_day": daily_data,
         "by_month": monthly_data,
-        "peak_hour": peak_hour[0],
-        "peak_hour_label": f"{peak_hour[0]:02d}:00",
-        "peak_day": peak_day[0],
-        "peak_day_label": day_names[peak_day[0]] if peak_day[1] > 0 else "N/A",
+        "peak_hour": peak_hour,
+        "peak_hour_label": f"{peak_hour:02d}:00",
+        "peak_day": peak_day,
+        "peak_day_label": day_names[peak_day] if by_day[peak_day] > 0 else "N/A",
     }
 
 
@@ -98,22 +94,15 @@ def get_listening_streaks(content_type: ContentType = "all") -> Dict:
     """
     Calculate listening streaks - consecutive days with plays.
     """
-    plays = get_all_plays_with_timestamps(content_type)
-    
-    # Get unique days
-    listening_days = set()
-    for play in plays:
+    # Get unique days (SQLite returns them distinct and sorted)
+    sorted_days = []
+    for day in get_listening_days(content_type):
         try:
-            ts = play.replace("Z", "").replace("+00:00", "")
-            if "." in ts:
-                dt = datetime.fromisoformat(ts)
-            else:
-                dt = datetime.fromisoformat(ts)
-            listening_days.add(dt.date())
-        except (ValueError, AttributeError):
+            sorted_days.append(date.fromisoformat(day))
+        except (ValueError, TypeError):
             continue
     
-    if not listening_days:
+    if not sorted_days:
         return {
             "current_streak": 0,
             "longest_streak": 0,
@@ -123,31 +112,15 @@ def get_listening_streaks(content_type: ContentType = "all") -> Dict:
             "longest_streak_end": None,
         }
     
-    sorted_days = sorted(listening_days)
-    
-    # Calculate streaks
-    streaks = []
-    current_streak_start = sorted_days[0]
-    current_streak_length = 1
-    
-    for i in range(1, len(sorted_days)):
-        if (sorted_days[i] - sorted_days[i-1]).days == 1:
-            current_streak_length += 1
-        else:
-            streaks.append({
-                "start": current_streak_start,
-                "end": sorted_days[i-1],
-                "length": current_streak_length
-            })
-            current_streak_start = sorted_days[i]
-            current_streak_length = 1
-    
-    # Don't forget the last streak
-    streaks.append({
-        "start": current_streak_start,
-        "end": sorted_days[-1],
-        "length": current_streak_length
-    })
+    # Consecutive calendar days have consecutive ordinals, so a streak breaks
+    # wherever the ordinal gap is not 1
+    ordinals = [d.toordinal() for d in sorted_days]
+    breaks = [i for i in range(1, len(ordinals)) if ordinals[i] - ordinals[i - 1] != 1]
+    bounds = [0, *breaks, len(ordinals)]
+    streaks = [
+        {"start": sorted_days[start], "end": sorted_days[end - 1], "length": end - start}
+        for start, end in zip(bounds, bounds[1:])
+    ]
     
     # Find longest streak
     longest = max(streaks, key=lambda x: x["length"])
@@ -160,21 +133,14 @@ def get_listening_streaks(content_type: ContentType = "all") -> Dict:
     current_streak_start_date = None
     
     if sorted_days[-1] >= yesterday:
-        # Count backwards from most recent day
-        current_streak = 1
-        current_streak_start_date = sorted_days[-1]
-        
-        for i in range(len(sorted_days) - 2, -1, -1):
-            if (sorted_days[i+1] - sorted_days[i]).days == 1:
-                current_streak += 1
-                current_streak_start_date = sorted_days[i]
-            else:
-                break
+        # The most recent streak is the last one
+        current_streak = streaks[-1]["length"]
+        current_streak_start_date = streaks[-1]["start"]
     
     return {
         "current_streak": current_streak,
         "longest_streak": longest["length"],
-        "total_listening_days": len(listening_days),
+        "total_listening_days": len(sorted_days),
         "streak_start": current_streak_start_date.isoformat() if current_streak_start_date else None,
         "longest_streak_start": longest["start"].isoformat(),
         "longest_streak_end": longest["end"].isoformat(),
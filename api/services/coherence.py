@@ -136,18 +136,7 @@ def score_recency_bonus(
     return min(1.0, 0.5 + (plays / max_plays) * 0.5)
 
 
-def score_popularity_balance(popularity: int) -> float:
-    """
-    Score that prefers hidden gems over mega-popular tracks.
-
-    Popularity 0-100 from Spotify.
-    Sweet spot: 30-60 (known but not overplayed)
-
-    Returns 0-1.
-    """
-    if popularity is None:
-        return 0.5
-
+def _popularity_balance(popularity: float) -> float:
     # Bell curve centered around 45
     # Very popular (>80) or very obscure (<10) get lower scores
     if 30 <= popularity <= 60:
@@ -162,6 +151,27 @@ def score_popularity_balance(popularity: int) -> float:
         return 0.3  # Too popular / overplayed
 
 
+# Spotify popularity is an integer 0-100, so the curve is tabulated once
+_POPULARITY_BALANCE = tuple(_popularity_balance(p) for p in range(101))
+
+
+def score_popularity_balance(popularity: int) -> float:
+    """
+    Score that prefers hidden gems over mega-popular tracks.
+
+    Popularity 0-100 from Spotify.
+    Sweet spot: 30-60 (known but not overplayed)
+
+    Returns 0-1.
+    """
+    if popularity is None:
+        return 0.5
+
+    if type(popularity) is int and 0 <= popularity <= 100:
+        return _POPULARITY_BALANCE[popularity]
+    return _popularity_balance(popularity)
+
+
 def score_diversity_penalty(
     track_artist: str,
     selected_artists: Dict[str, int],
@@ -1,20 +1,25 @@
 from typing import List, Dict, Set, Optional, Literal, Tuple
 from datetime import datetime, timedelta
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
 from functools import lru_cache
+from operator import itemgetter
+import heapq
 import random
 import math
 import re
 import unicodedata
 from ..db import (
-    get_all_tracks_with_counts, get_top_artists, get_top_genres, query_all_dbs,
-    get_top_tracks, get_recent_listening, search_user_tracks
+    get_all_tracks_with_counts, get_top_artists, get_top_genres,
+    get_top_tracks, get_recent_listening, search_user_tracks, get_track_genres,
+    get_track_genre_bits, get_known_first_artists,
 )
 from ..spotify_client import (
     enrich_tracks_with_spotify_data, search_tracks_by_genre, get_audio_features,
     get_recommendations, get_artist_related, get_artist_top_tracks, search_artist,
     get_artist_albums, get_album_tracks, get_tracks_bulk, get_artists_bulk,
-    search_tracks_advanced,
+    search_tracks_advanced, ttl_cache,
 )
 from ..lastfm_client import get_similar_artists, get_similar_tracks_batch
 from .vibe_profile import build_vibe_profile, VibeProfile, get_top_genres as vibe_top_genres
@@ -22,48 +27,63 @@ from .coherence import compute_total_coherence, get_coherence_breakdown, score_p
 from .flow_ordering import order_playlist, FlowMode
 
 
-def score_track_by_features(
+# Audio feature weights, in the order their contributions are summed
+_FEATURE_WEIGHTS = (
+    ('energy', 1.0),
+    ('valence', 1.0),
+    ('danceability', 0.8),
+    ('tempo', 0.5),
+    ('acousticness', 0.7),
+)
+
+
+# Request-side feature filters: (feature, default min, default max, scale).
+# Percent sliders scale to Spotify's 0-1 range; tempo stays in BPM.
+_FEATURE_FILTERS = (
+    ('energy', 0, 100, 100),
+    ('valence', 0, 100, 100),
+    ('danceability', 0, 100, 100),
+    ('tempo', 60, 200, 1),
+    ('acousticness', 0, 100, 100),
+)
+
+
+def _normalize_tempo(bpm: float) -> float:
+    """Map a tempo onto 0-1 over the 60-200 BPM range."""
+    return max(0, min(1, (bpm - 60) / 140))
+
+
+def _feature_bounds(targets: Dict[str, tuple]) -> List[Tuple[str, float, float, float]]:
+    """Resolve targets to (feature, weight, min, max), with tempo already normalized."""
+    bounds = []
+    for feature, weight in _FEATURE_WEIGHTS:
+        if feature not in targets:
+            continue
+        min_val, max_val = targets[feature]
+        if feature == 'tempo':
+            min_val, max_val = _normalize_tempo(min_val), _normalize_tempo(max_val)
+        bounds.append((feature, weight, min_val, max_val))
+    return bounds
+
+
+def _score_features(
     track: Dict,
     features: Dict,
-    targets: Dict[str, tuple],
+    bounds: List[Tuple[str, float, float, float]],
 ) -> float:
-    """
-    Score how well a track matches target audio features.
-    targets: dict of feature_name -> (min, max) or (target,) for single value
-    Returns score 0-1 where 1 is perfect match.
-    """
     if not features:
         return 0.5  # Neutral score if no features available
 
-    weights = {
-        'energy': 1.0,
-        'valence': 1.0,
-        'danceability': 0.8,
-        'tempo': 0.5,
-        'acousticness': 0.7,
-    }
-
     total_weight = 0
     total_score = 0
 
-    for feature, weight in weights.items():
-        if feature not in targets:
-            continue
-
-        target_range = targets[feature]
+    for feature, weight, min_val, max_val in bounds:
         actual = features.get(feature)
         if actual is None:
             continue
 
-        # Normalize tempo to 0-1 range (60-200 BPM)
         if feature == 'tempo':
-            actual = max(0, min(1, (actual - 60) / 140))
-            target_range = (
-                max(0, min(1, (target_range[0] - 60) / 140)),
-                max(0, min(1, (target_range[1] - 60) / 140)),
-            )
-
-        min_val, max_val = target_range
+            actual = _normalize_tempo(actual)
 
         # Check if within range
         if min_val <= actual <= max_val:
@@ -90,6 +110,37 @@ def score_track_by_features(
     return min(1.0, feature_score + play_bonus)
 
 
+def score_track_by_features(
+    track: Dict,
+    features: Dict,
+    targets: Dict[str, tuple],
+) -> float:
+    """
+    Score how well a track matches target audio features.
+    targets: dict of feature_name -> (min, max) or (target,) for single value
+    Returns score 0-1 where 1 is perfect match.
+    """
+    return _score_features(track, features, _feature_bounds(targets))
+
+
+def score_tracks_by_features(
+    tracks: List[Dict],
+    features_list: List[Dict],
+    targets: Dict[str, tuple],
+) -> List[float]:
+    """
+    Score many tracks against the same targets.
+
+    Equivalent to calling score_track_by_features per track, but the
+    targets are resolved once for the whole batch.
+    """
+    bounds = _feature_bounds(targets)
+    return [
+        _score_features(track, features, bounds)
+        for track, features in zip(tracks, features_list)
+    ]
+
+
 def generate_custom_playlist(
     genres: List[str] = None,
     exclude_genres: List[str] = None,
@@ -141,32 +192,21 @@ def generate_custom_playlist(
     exclude_artists_lower = {a.lower() for a in exclude_artists}
 
     # Build audio feature targets dict
+    requested_ranges = {
+        'energy': (energy_min, energy_max),
+        'valence': (valence_min, valence_max),
+        'danceability': (danceability_min, danceability_max),
+        'tempo': (tempo_min, tempo_max),
+        'acousticness': (acousticness_min, acousticness_max),
+    }
     feature_targets: Dict[str, tuple] = {}
-    if energy_min is not None or energy_max is not None:
-        feature_targets['energy'] = (
-            (energy_min or 0) / 100,
-            (energy_max or 100) / 100,
-        )
-    if valence_min is not None or valence_max is not None:
-        feature_targets['valence'] = (
-            (valence_min or 0) / 100,
-            (valence_max or 100) / 100,
-        )
-    if danceability_min is not None or danceability_max is not None:
-        feature_targets['danceability'] = (
-            (danceability_min or 0) / 100,
-            (danceability_max or 100) / 100,
-        )
-    if tempo_min is not None or tempo_max is not None:
-        feature_targets['tempo'] = (
-            tempo_min or 60,
-            tempo_max or 200,
-        )
-    if acousticness_min is not None or acousticness_max is not None:
-        feature_targets['acousticness'] = (
-            (acousticness_min or 0) / 100,
-            (acousticness_max or 100) / 100,
-        )
+    for feature, default_min, default_max, scale in _FEATURE_FILTERS:
+        low, high = requested_ranges[feature]
+        if low is not None or high is not None:
+            feature_targets[feature] = (
+                (low or default_min) / scale,
+                (high or default_max) / scale,
+            )
 
     use_audio_features = bool(feature_targets)
     
@@ -182,17 +222,20 @@ def generate_custom_playlist(
     # === PART 1: Get tracks from listening history ===
     if history_count > 0:
         
-        # Build genre map for tracks
-        track_genres: Dict[str, Set[str]] = {}
-        for db_result in query_all_dbs("SELECT track_id, genre FROM plays WHERE track_id IS NOT NULL AND genre != ''"):
-            tid = db_result.get("track_id")
-            genre_str = db_result.get("genre", "")
-            if tid and genre_str:
-                if tid not in track_genres:
-                    track_genres[tid] = set()
-                for g in genre_str.split(", "):
-                    if g.strip():
-                        track_genres[tid].add(g.strip().lower())
+        # Genre map for tracks, shared across requests until the archive changes
+        track_genres = get_track_genres()
+
+        # Genre filters match by substring in either direction. The archive
+        # only has a few hundred distinct genres, so resolve each filter to
+        # a bitmask of the genres it matches once and test tracks with an AND.
+        genre_bits, track_bits = get_track_genre_bits()
+        include_mask = 0
+        exclude_mask = 0
+        for tg, bit in genre_bits.items():
+            if any(g in tg or tg in g for g in genres_lower):
+                include_mask |= bit
+            if any(g in tg or tg in g for g in exclude_lower):
+                exclude_mask |= bit
         
         # Get top artists if needed
         top_artist_names = set()
@@ -202,92 +245,85 @@ def generate_custom_playlist(
         
         now = datetime.utcnow()
         cutoff_date = now - timedelta(days=max_days)
+        # played_at is stored as UTC ISO-8601, which sorts lexicographically,
+        # so play count and recency are applied before any track dicts are built
+        cutoff_iso = cutoff_date.strftime("%Y-%m-%dT%H:%M:%S")
+        active_tracks = get_all_tracks_with_counts(
+            "music", min_plays=min_plays, played_since=cutoff_iso
+        )
         
-        # Filter and score tracks
-        candidates = []
+        # Filter and score tracks. Survivors stay as (track_id, stats row)
+        # pairs; only the picks that make the playlist become output dicts.
+        candidates: List[Tuple[str, Dict]] = []
         artist_counts: Dict[str, int] = {}
         
-        for tid, track_data in all_tracks.items():
+        for tid, track_data in active_tracks.items():
             if not tid:
                 continue
             
-            # Check play count
-            if track_data["play_count"] < min_plays:
-                continue
-            
-            # Check recency
-            try:
-                last_played_str = track_data["last_played"].replace("Z", "").replace("+00:00", "")
-                if "." in last_played_str:
-                    last_played = datetime.fromisoformat(last_played_str)
-                else:
-                    last_played = datetime.fromisoformat(last_played_str)
-                
-                if last_played < cutoff_date:
-                    continue
-            except (ValueError, AttributeError):
-                continue
-            
             # Check genres
-            track_genre_set = track_genres.get(tid, set())
+            genre_mask = track_bits.get(tid, 0)
             
             # If genres specified, track must have at least one matching genre
-            if genres_lower:
-                has_match = any(
-                    any(g in tg or tg in g for g in genres_lower)
-                    for tg in track_genre_set
-                )
-                if not has_match:
-                    continue
+            if genres_lower and not genre_mask & include_mask:
+                continue
             
             # Check excluded genres
-            if exclude_lower:
-                has_excluded = any(
-                    any(g in tg or tg in g for g in exclude_lower)
-                    for tg in track_genre_set
-                )
-                if has_excluded:
-                    continue
+            if exclude_lower and genre_mask & exclude_mask:
+                continue
             
             # Check artist filter
-            artist_lower = track_data["artist"].lower()
+            artist_lower, first_artist = _artist_keys(track_data["artist"])
             if artist_filter == "top" and artist_lower not in top_artist_names:
                 continue
 
             # Check excluded artists
-            first_artist = artist_lower.split(",")[0].strip()
             if first_artist in exclude_artists_lower:
                 continue
 
             # For diverse mode, track artist counts
             if artist_filter == "diverse":
-                if artist_counts.get(first_artist, 0) >= 2:
+                artist_count = artist_counts.get(first_artist, 0)
+                if artist_count >= 2:
                     continue
-                artist_counts[first_artist] = artist_counts.get(first_artist, 0) + 1
+                artist_counts[first_artist] = artist_count + 1
 
-            candidates.append({
+            candidates.append((tid, track_data))
+
+        def history_pick(tid: str, track_data: Dict) -> Dict:
+            return {
                 "track_id": tid,
                 "track": track_data["track"],
                 "artist": track_data["artist"],
                 "play_count": track_data["play_count"],
                 "last_played": track_data["last_played"],
-                "genres": list(track_genre_set)[:3],
+                "genres": list(track_genres.get(tid, ()))[:3],
                 "source": "history",
-            })
+            }
 
         # If using audio features, fetch them and score/filter
         if use_audio_features and candidates:
-            track_ids = [c["track_id"] for c in candidates if c.get("track_id")]
+            track_ids = [tid for tid, _ in candidates]
             audio_features = get_audio_features(track_ids)
             features_map = {f["id"]: f for f in audio_features if f}
 
-            # Score and filter candidates
-            scored_candidates = []
-            for c in candidates:
-                tid = c.get("track_id")
-                features = features_map.get(tid, {})
-                score = score_track_by_features(c, features, feature_targets)
-
+            # Score and filter candidates; the stats rows carry play_count
+            candidate_features = [features_map.get(tid, {}) for tid in track_ids]
+            scores = score_tracks_by_features(
+                [track_data for _, track_data in candidates], candidate_features, feature_targets
+            )
+            # Only include tracks that score above threshold
+            scored_candidates = [
+                (score, candidate, features)
+                for candidate, features, score in zip(candidates, candidate_features, scores)
+                if score >= 0.3
+            ]
+
+            # Best matches first; nlargest keeps sort()'s tie order
+            for score, (tid, track_data), features in heapq.nlargest(
+                history_count, scored_candidates, key=itemgetter(0)
+            ):
+                c = history_pick(tid, track_data)
                 # Add features to track data for frontend display
                 c["energy"] = features.get("energy")
                 c["valence"] = features.get("valence")
@@ -295,31 +331,40 @@ def generate_custom_playlist(
                 c["tempo"] = features.get("tempo")
                 c["acousticness"] = features.get("acousticness")
                 c["score"] = score
-
-                # Only include tracks that score above threshold
-                if score >= 0.3:
-                    scored_candidates.append(c)
-
-            # Sort by score (best matches first)
-            scored_candidates.sort(key=lambda x: x.get("score", 0), reverse=True)
-            result.extend(scored_candidates[:history_count])
+                result.append(c)
         else:
-            # Sort by play count and take required number
-            candidates.sort(key=lambda x: x["play_count"], reverse=True)
-            result.extend(candidates[:history_count])
+            # Take the required number by play count
+            result.extend(
+                history_pick(tid, track_data)
+                for tid, track_data in heapq.nlargest(
+                    history_count, candidates, key=lambda c: c[1]["play_count"]
+                )
+            )
     
+    # History picks are final here and enrichment only reads them, so start
+    # the Spotify lookup now and let it overlap with discovery. shutdown()
+    # without waiting still runs the submitted lookup to completion.
+    # Only history picks are in result at this point; one pass collects them
+    # for both enrichment and the discovery dedupe below.
+    history_tracks = [t for t in result if t.get("source") == "history"]
+    enrichment = None
+    if history_tracks:
+        enrich_executor = ThreadPoolExecutor(max_workers=1)
+        enrichment = enrich_executor.submit(enrich_tracks_with_spotify_data, history_tracks)
+        enrich_executor.shutdown(wait=False)
+
     # === PART 2: Get new tracks from Spotify ===
     if discovery_count > 0:
         # Use ALL track IDs from user's history to avoid suggesting songs they've heard
         existing_ids = set(all_tracks.keys())
-        existing_ids.update(t["track_id"] for t in result if t.get("track_id"))
+        existing_ids.update(t["track_id"] for t in history_tracks if t.get("track_id"))
 
         # Track artists - known artists from history
-        known_artists = {t["artist"].lower().split(",")[0].strip() for t in all_tracks.values()}
-        playlist_artists = {t["artist"].lower().split(",")[0].strip() for t in result}
+        known_artists = get_known_first_artists("music")
         excluded = set(exclude_artists_lower)
 
         discovery_candidates = []
+        discovery_artist_counts: Dict[str, int] = {}
 
         def add_track(track: Dict, source: str, popularity_boost: int = 0) -> bool:
             """Try to add a track. Returns True if added."""
@@ -327,15 +372,16 @@ def generate_custom_playlist(
             if not track_id or track_id in existing_ids:
                 return False
 
-            track_artists = [a.get("name", "").lower() for a in track.get("artists", [])]
-            first_artist = track_artists[0].split(",")[0].strip() if track_artists else ""
+            # Only the first credited artist matters, so key it directly
+            artists = track.get("artists") or [{}]
+            first_artist = _artist_keys(artists[0].get("name", ""))[1]
 
             # Skip explicitly excluded artists
             if first_artist in excluded:
                 return False
 
             # Skip if we already have 2 tracks from this artist in the playlist
-            artist_count = sum(1 for c in discovery_candidates if c.get("_artist_key") == first_artist)
+            artist_count = discovery_artist_counts.get(first_artist, 0)
             if artist_count >= 2:
                 return False
 
@@ -357,6 +403,7 @@ def generate_custom_playlist(
                 "_artist_key": first_artist,
                 "_is_new_artist": first_artist not in known_artists,
             })
+            discovery_artist_counts[first_artist] = artist_count + 1
             existing_ids.add(track_id)
             return True
 
@@ -366,12 +413,16 @@ def generate_custom_playlist(
         recent_tracks = [t["track_id"] for t in recent["tracks"][:10] if t.get("track_id")]
         recent_genres = [g["genre"] for g in recent["genres"][:10]]
 
-        # Get Spotify IDs for recent artists
+        # Get Spotify IDs for recent artists; the lookups are independent,
+        # so run them together and keep the recency order
         artist_id_map = {}  # name -> id
-        for artist_name in recent_artists[:10]:
-            artist_info = search_artist(artist_name)
-            if artist_info and artist_info.get("id"):
-                artist_id_map[artist_name] = artist_info["id"]
+        seed_names = recent_artists[:10]
+        if seed_names:
+            with ThreadPoolExecutor(max_workers=min(8, len(seed_names))) as executor:
+                artist_infos = list(executor.map(search_artist, seed_names))
+            for artist_name, artist_info in zip(seed_names, artist_infos):
+                if artist_info and artist_info.get("id"):
+                    artist_id_map[artist_name] = artist_info["id"]
 
         recent_artist_ids = list(artist_id_map.values())
 
@@ -383,23 +434,27 @@ def generate_custom_playlist(
                     break
                 seeds = recent_tracks[i:i+5]
                 recs = get_recommendations(seed_tracks=seeds, limit=100)
+                # Drop known and very popular (top 40 stuff) tracks before
+                # sorting, so only the survivors are ordered
+                recs = [
+                    t for t in recs
+                    if t.get("id") and t["id"] not in existing_ids
+                    and t.get("popularity", 0) <= 70
+                ]
                 # Prefer less popular tracks
                 recs.sort(key=lambda t: t.get("popularity", 50))
                 for track in recs:
                     if len(discovery_candidates) >= discovery_count:
                         break
-                    # Skip very popular tracks (top 40 stuff)
-                    if track.get("popularity", 0) > 70:
-                        continue
                     add_track(track, "based on recent plays")
 
         # === STRATEGY 2: Deep dive into related artists (2-3 hops) ===
         if len(discovery_candidates) < discovery_count and recent_artist_ids:
             explored = set()
-            queue = [(aid, 0, name) for name, aid in list(artist_id_map.items())[:5]]  # (id, depth, seed_name)
+            queue = deque((aid, 0, name) for name, aid in list(artist_id_map.items())[:5])  # (id, depth, seed_name)
 
             while queue and len(discovery_candidates) < discovery_count:
-                artist_id, depth, seed_name = queue.pop(0)
+                artist_id, depth, seed_name = queue.popleft()
 
                 if artist_id in explored or depth > 2:
                     continue
@@ -407,9 +462,9 @@ def generate_custom_playlist(
 
                 # Get related artists
                 related = get_artist_related(artist_id)
-                random.shuffle(related)
 
-                for rel in related[:6]:
+                # A random six in random order, without shuffling the whole list
+                for rel in random.sample(related, min(6, len(related))):
                     rel_id = rel.get("id")
                     rel_name = rel.get("name", "")
 
@@ -426,20 +481,31 @@ def generate_custom_playlist(
 
                     # Get album tracks (not just top tracks - deeper cuts!)
                     albums = get_artist_albums(rel_id, limit=3)
-                    for album in albums:
+                    # Fetch the (at most three) albums' tracks together
+                    with ThreadPoolExecutor(max_workers=max(1, len(albums))) as executor:
+                        album_fetches = [
+                            executor.submit(get_album_tracks, album.get("id")) for album in albums
+                        ]
+                    for album_fetch in album_fetches:
                         if len(discovery_candidates) >= discovery_count:
                             break
 
-                        album_tracks = get_album_tracks(album.get("id"))
-                        # Sort by popularity ascending (find the hidden gems)
-                        album_tracks.sort(key=lambda t: t.get("popularity", 50) if t else 100)
-
-                        for track in album_tracks[:4]:  # Take up to 4 deep cuts per album
-                            if not track or len(discovery_candidates) >= discovery_count:
+                        # Prefer tracks that aren't the obvious singles. Singles
+                        # rank after every other track anyway, so dropping them
+                        # first leaves the same four deep cuts to pick from
+                        album_tracks = [
+                            t for t in album_fetch.result()
+                            if t and t.get("popularity", 0) <= 60
+                        ]
+                        # Least popular first (find the hidden gems); nsmallest
+                        # matches sort()[:4] without ordering the whole album
+                        deep_cuts = heapq.nsmallest(
+                            4, album_tracks, key=lambda t: t.get("popularity", 50)
+                        )
+
+                        for track in deep_cuts:  # Take up to 4 deep cuts per album
+                            if len(discovery_candidates) >= discovery_count:
                                 break
-                            # Prefer tracks that aren't the obvious singles
-                            if track.get("popularity", 0) > 60:
-                                continue
                             add_track(track, f"deep cut · {rel_name} (via {seed_name})")
 
                     # Also get some top tracks as fallback
@@ -456,22 +522,34 @@ def generate_custom_playlist(
             if not search_genres:
                 search_genres = ["indie", "alternative", "folk", "electronic"]
 
-            for genre in search_genres:
+            search_genres = [
+                genre for genre in search_genres
+                if not any(ex in genre.lower() for ex in exclude_lower)
+            ]
+            # Issue the (at most five) searches together but consume them in
+            # order, so the picks and any raised error match the sequential walk
+            with ThreadPoolExecutor(max_workers=max(1, len(search_genres))) as executor:
+                searches = [
+                    executor.submit(search_tracks_by_genre, genre, limit=50)
+                    for genre in search_genres
+                ]
+
+            for genre, search in zip(search_genres, searches):
                 if len(discovery_candidates) >= discovery_count:
                     break
-                if any(ex in genre.lower() for ex in exclude_lower):
-                    continue
 
-                # Search with year filter for fresh music
-                tracks = search_tracks_by_genre(genre, limit=50)
+                # Only unseen, low-popularity tracks are worth sorting
+                tracks = [
+                    t for t in search.result()
+                    if t.get("id") and t["id"] not in existing_ids
+                    and t.get("popularity", 0) <= 50
+                ]
                 # Sort by popularity to find hidden gems
                 tracks.sort(key=lambda t: t.get("popularity", 50))
 
                 for track in tracks:
                     if len(discovery_candidates) >= discovery_count:
                         break
-                    if track.get("popularity", 0) > 50:  # Only low-popularity tracks
-                        continue
                     add_track(track, f"hidden gem · {genre}")
 
         # === Sort final results: prioritize new artists + lower popularity ===
@@ -507,13 +585,13 @@ def generate_custom_playlist(
         result.extend(discovery_candidates)
     
     # === PART 3: Enrich history tracks with Spotify data ===
-    history_tracks = [t for t in result if t.get("source") == "history"]
-    if history_tracks:
-        enriched = enrich_tracks_with_spotify_data(history_tracks)
+    if enrichment is not None:
+        enriched = enrichment.result()
         enriched_map = {t["track_id"]: t for t in enriched}
-        for i, t in enumerate(result):
-            if t["track_id"] in enriched_map and t.get("source") == "history":
-                result[i] = {**t, **enriched_map[t["track_id"]]}
+        # History picks were built fresh in Part 1, so merge in place
+        for t in result:
+            if t.get("source") == "history" and t["track_id"] in enriched_map:
+                t.update(enriched_map[t["track_id"]])
     
     # Shuffle to mix history and discovery
     if discovery_ratio > 0 and discovery_ratio < 100:
@@ -522,11 +600,20 @@ def generate_custom_playlist(
     return result[:limit]
 
 
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+@lru_cache(maxsize=65536)
 def _normalize_music_text(value: str) -> str:
-    """Normalize artist/title metadata for cross-catalog exact matching."""
+    """
+    Normalize artist/title metadata for cross-catalog exact matching.
+
+    Memoised: vibe ranking normalizes every archived artist and title on each
+    request, and the archive's names barely change between requests.
+    """
     text = unicodedata.normalize("NFKD", value or "").encode("ascii", "ignore").decode()
     text = text.lower().replace("&", " and ")
-    return re.sub(r"[^a-z0-9]+", "", text)
+    return _NON_ALNUM_RE.sub("", text)
 
 
 def _primary_artist_name(value: str) -> str:
@@ -534,6 +621,18 @@ def _primary_artist_name(value: str) -> str:
     return (value or "").split(",", 1)[0].strip()
 
 
+@lru_cache(maxsize=16384)
+def _artist_keys(artist: str) -> Tuple[str, str]:
+    """
+    Return the lowercased credit string and its lowercased first artist.
+
+    Memoised: the custom playlist derives both for every archived track, and
+    prolific artists repeat across many tracks.
+    """
+    artist_lower = artist.lower()
+    return artist_lower, artist_lower.split(",", 1)[0].strip()
+
+
 def _track_key(artist: str, title: str) -> Tuple[str, str]:
     return (_normalize_music_text(artist), _normalize_music_text(title))
 
@@ -706,6 +805,7 @@ def _generate_vibe_playlist_legacy(
             for artist in track.get("artists", []):
                 anchor_artist_names.add(artist.get("name", "").lower())
 
+
         for track in history_spotify:
             tid = track.get("id")
             if not tid or tid in existing_ids:
@@ -766,7 +866,6 @@ def _generate_vibe_playlist_legacy(
 
     # === DISCOVERY CANDIDATES ===
     if discovery_count > 0:
-        known_artist_names = {t["artist"].lower().split(",")[0].strip() for t in all_history.values()}
         top_vibe_genres = vibe_top_genres(profile, limit=5)
 
         # Get anchor artist names for matching
@@ -1001,29 +1100,43 @@ def _generate_vibe_playlist_legacy(
     }
 
 
-def generate_vibe_playlist(
-    anchor_track_ids: List[str],
-    track_count: int = 30,
-    discovery_ratio: int = 50,
-    flow_mode: FlowMode = "smooth",
-    exclude_artists: List[str] = None,
-    coherence_threshold: float = 0.50,
-    max_per_anchor_artist: int = 3,
-    max_per_similar_artist: int = 2,
-) -> Dict:
-    """Generate a playlist backed by exact Last.fm similarity evidence.
+@dataclass(frozen=True)
+class AnchorNeighbourhood:
+    """Anchor-derived similarity evidence, shared by requests for the same anchors."""
 
-    Spotify no longer exposes recommendations, related artists, or audio
-    features to many development-mode apps. The former fallback treated broad
-    genre substrings as evidence (for example, ``pop`` matching ``baroque
-    pop``), which admitted unrelated tracks. This implementation uses exact
-    artist/title matches from Last.fm's similarity graph and validates every
-    result against Spotify before returning it.
-    """
-    exclude_keys = {_normalize_music_text(name) for name in (exclude_artists or [])}
-    if not anchor_track_ids or len(anchor_track_ids) > 5:
-        raise ValueError("Need 1-5 anchor tracks")
+    anchor_tracks: List[Dict]
+    anchor_pairs: List[Tuple[str, str]]
+    anchor_artist_keys: Set[str]
+    artist_evidence: Dict[str, Dict]
+    track_evidence: Dict[Tuple[str, str], Dict]
+    anchor_genres: List[str]
+
+
+# Anchor metadata (popularity, previews) and similarity evidence drift, so a
+# resolved neighbourhood is only reused for a while.
+ANCHOR_CACHE_TTL = 600
 
+
+def _is_complete_neighbourhood(neighbourhood: AnchorNeighbourhood) -> bool:
+    """Whether every lookup behind a neighbourhood returned something worth caching."""
+    return bool(neighbourhood.anchor_genres) and any(
+        evidence["rank"] >= 0 for evidence in neighbourhood.artist_evidence.values()
+    )
+
+
+@ttl_cache(ttl=ANCHOR_CACHE_TTL, maxsize=64, keep=_is_complete_neighbourhood)
+def _anchor_neighbourhood(anchor_track_ids: Tuple[str, ...]) -> AnchorNeighbourhood:
+    """
+    Resolve anchors and their Last.fm neighbourhood once per anchor sequence.
+
+    Re-rolling a vibe with the same anchors (different ratio, length or
+    exclusions) skips the Spotify anchor lookups and evidence ranking.
+    Exclusions are applied by the caller. Anchor order is part of the key
+    because it decides which anchor a tied neighbour is attributed to.
+    Results expire after ANCHOR_CACHE_TTL seconds, and one whose anchor
+    genres or similar artists came back empty (often a transient API
+    failure) is not kept at all. Callers must not mutate the result.
+    """
     anchor_tracks = get_tracks_bulk(anchor_track_ids)
     anchor_map = {track.get("id"): track for track in anchor_tracks if track}
     anchor_tracks = [anchor_map[track_id] for track_id in anchor_track_ids if track_id in anchor_map]
@@ -1047,7 +1160,7 @@ def generate_vibe_playlist(
         for rank, item in enumerate(similar):
             name = item.get("name", "").strip()
             key = _normalize_music_text(name)
-            if not key or key in exclude_keys:
+            if not key:
                 continue
             rank_score = 1 - rank / total
             raw_match = min(1.0, float(item.get("match", 0) or 0))
@@ -1082,7 +1195,7 @@ def generate_vibe_playlist(
             artist = item.get("artist", "").strip()
             title = item.get("name", "").strip()
             key = _track_key(artist, title)
-            if not all(key) or key[0] in exclude_keys:
+            if not all(key):
                 continue
             rank_score = 1 - rank / total
             relation = min(0.99, 0.72 + 0.25 * rank_score)
@@ -1096,15 +1209,6 @@ def generate_vibe_playlist(
                     "rank": rank,
                 }
 
-    all_history = get_all_tracks_with_counts("music")
-    known_track_ids = set(all_history)
-    known_track_keys = {
-        _track_key(_primary_artist_name(row.get("artist", "")), row.get("track", ""))
-        for row in all_history.values()
-    }
-    desired_discovery = int(track_count * discovery_ratio / 100)
-    desired_history = track_count - desired_discovery
-
     # Fetch anchor genres for the UI's vibe summary. Similarity-neighborhood
     # tags are kept separately and only used as a flow fallback.
     anchor_artist_ids = {
@@ -1120,6 +1224,63 @@ def generate_vibe_playlist(
             if genre not in anchor_genres:
                 anchor_genres.append(genre)
 
+    return AnchorNeighbourhood(
+        anchor_tracks=anchor_tracks,
+        anchor_pairs=anchor_pairs,
+        anchor_artist_keys=anchor_artist_keys,
+        artist_evidence=artist_evidence,
+        track_evidence=track_evidence,
+        anchor_genres=anchor_genres,
+    )
+
+
+def generate_vibe_playlist(
+    anchor_track_ids: List[str],
+    track_count: int = 30,
+    discovery_ratio: int = 50,
+    flow_mode: FlowMode = "smooth",
+    exclude_artists: List[str] = None,
+    coherence_threshold: float = 0.50,
+    max_per_anchor_artist: int = 3,
+    max_per_similar_artist: int = 2,
+) -> Dict:
+    """Generate a playlist backed by exact Last.fm similarity evidence.
+
+    Spotify no longer exposes recommendations, related artists, or audio
+    features to many development-mode apps. The former fallback treated broad
+    genre substrings as evidence (for example, ``pop`` matching ``baroque
+    pop``), which admitted unrelated tracks. This implementation uses exact
+    artist/title matches from Last.fm's similarity graph and validates every
+    result against Spotify before returning it.
+    """
+    exclude_keys = {_normalize_music_text(name) for name in (exclude_artists or [])}
+    if not anchor_track_ids or len(anchor_track_ids) > 5:
+        raise ValueError("Need 1-5 anchor tracks")
+
+    neighbourhood = _anchor_neighbourhood(tuple(anchor_track_ids))
+    anchor_tracks = neighbourhood.anchor_tracks
+    anchor_pairs = neighbourhood.anchor_pairs
+    anchor_artist_keys = neighbourhood.anchor_artist_keys
+    anchor_genres = neighbourhood.anchor_genres
+    # Anchor artists stay in the neighbourhood even when excluded
+    artist_evidence = {
+        key: evidence for key, evidence in neighbourhood.artist_evidence.items()
+        if key not in exclude_keys or evidence["rank"] == -1
+    }
+    track_evidence = {
+        key: evidence for key, evidence in neighbourhood.track_evidence.items()
+        if key[0] not in exclude_keys
+    }
+
+    all_history = get_all_tracks_with_counts("music")
+    known_track_ids = set(all_history)
+    known_track_keys = {
+        _track_key(_primary_artist_name(row.get("artist", "")), row.get("track", ""))
+        for row in all_history.values()
+    }
+    desired_discovery = int(track_count * discovery_ratio / 100)
+    desired_history = track_count - desired_discovery
+
     candidates: List[Dict] = []
     seen_candidate_ids: Set[str] = set()
     seen_candidate_keys: Set[Tuple[str, str]] = set()
@@ -1211,12 +1372,13 @@ def generate_vibe_playlist(
             row,
         ))
 
-    history_ranked.sort(key=lambda item: (item[0], item[1]), reverse=True)
-    history_lookup = {item[3]["track_id"]: item for item in history_ranked}
-    history_fetch_ids = [
-        item[3]["track_id"]
-        for item in history_ranked[: max(100, desired_history * 10)]
-    ]
+    # Only the strongest slice is resolved on Spotify, so select it without
+    # sorting the whole archive (nlargest keeps sorted()'s tie order).
+    history_top = heapq.nlargest(
+        max(100, desired_history * 10), history_ranked, key=itemgetter(0, 1)
+    )
+    history_lookup = {item[3]["track_id"]: item for item in history_top}
+    history_fetch_ids = [item[3]["track_id"] for item in history_top]
     for track in get_tracks_bulk(history_fetch_ids):
         item = history_lookup.get(track.get("id"))
         if not item:
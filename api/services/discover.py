@@ -5,7 +5,7 @@ from functools import lru_cache
 from math import log1p
 import re
 import unicodedata
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 
 from ..db import get_all_artist_ids, get_all_tracks_with_counts, get_recent_listening, get_top_artists
 from ..lastfm_client import get_similar_artists
@@ -79,6 +79,33 @@ def get_similarity_candidates(seeds: List[str]) -> List[Dict]:
     )
 
 
+# Spotify lookups resolved concurrently per batch while discovering artists
+_RESOLVE_WORKERS = 8
+
+
+def _resolve_candidate(name: str) -> Optional[Tuple[Dict, List[Dict]]]:
+    """Resolve a candidate on Spotify and fetch the tracks to sample from."""
+    spotify_artist = search_artist(name)
+    if not spotify_artist:
+        return None
+    spotify_name = spotify_artist.get("name", "")
+    if normalize_artist_name(spotify_name) != normalize_artist_name(name):
+        return None
+
+    artist_id = spotify_artist.get("id")
+    if not artist_id:
+        return None
+
+    tracks = get_artist_top_tracks(artist_id, market="CH")
+    if not tracks:
+        tracks = [
+            track
+            for track in search_tracks_by_artist(spotify_name, limit=10)
+            if any(artist.get("id") == artist_id for artist in track.get("artists", []))
+        ]
+    return spotify_artist, tracks
+
+
 @lru_cache(maxsize=8)
 def discover_new_artists(limit: int = 20) -> List[Dict]:
     """Return novel, diverse artists related to the user's real favorites."""
@@ -87,68 +114,62 @@ def discover_new_artists(limit: int = 20) -> List[Dict]:
     seeds = get_seed_artists()
     candidates = get_similarity_candidates(seeds)
     resolved: List[Dict] = []
+    target = max(limit * 2, 30)
 
     # Resolve a bounded pool through Spotify and require an exact artist-name
     # match. This rejects the metadata impostors produced by broad genre search.
-    for candidate in candidates[:60]:
-        if len(resolved) >= max(limit * 2, 30):
-            break
-
-        name = candidate["artist_name"]
-        key = normalize_artist_name(name)
-        if key in known_names:
-            continue
-
-        spotify_artist = search_artist(name)
-        if not spotify_artist:
-            continue
-        spotify_name = spotify_artist.get("name", "")
-        if normalize_artist_name(spotify_name) != key:
-            continue
-
-        artist_id = spotify_artist.get("id")
-        if not artist_id:
-            continue
-
-        tracks = get_artist_top_tracks(artist_id, market="CH")
-        if not tracks:
-            tracks = [
-                track
-                for track in search_tracks_by_artist(spotify_name, limit=10)
-                if any(artist.get("id") == artist_id for artist in track.get("artists", []))
-            ]
-        sample = next(
-            (track for track in tracks if track.get("id") not in known_track_ids),
-            tracks[0] if tracks else None,
-        )
-        if not sample:
-            continue
+    # Lookups run a batch at a time and are consumed in rank order, so at most
+    # one batch is fetched beyond what the sequential walk would have used.
+    pending = [
+        candidate for candidate in candidates[:60]
+        if normalize_artist_name(candidate["artist_name"]) not in known_names
+    ]
+    with ThreadPoolExecutor(max_workers=_RESOLVE_WORKERS) as executor:
+        for start in range(0, len(pending), _RESOLVE_WORKERS):
+            if len(resolved) >= target:
+                break
+            batch = pending[start:start + _RESOLVE_WORKERS]
+            lookups = executor.map(
+                _resolve_candidate, [candidate["artist_name"] for candidate in batch]
+            )
+            for candidate, lookup in zip(batch, lookups):
+                if len(resolved) >= target:
+                    break
+                if not lookup:
+                    continue
+                spotify_artist, tracks = lookup
+                sample = next(
+                    (track for track in tracks if track.get("id") not in known_track_ids),
+                    tracks[0] if tracks else None,
+                )
+                if not sample:
+                    continue
 
-        images = spotify_artist.get("images", [])
-        popularity = int(spotify_artist.get("popularity", 0) or 0)
-        sources = candidate["sources"]
-        source_names = []
-        for source in sources:
-            if source["artist"] not in source_names:
-                source_names.append(source["artist"])
-
-        # Similarity dominates; popularity is only a small confidence prior so
-        # the list does not collapse into either stars or metadata ghosts.
-        quality_score = candidate["similarity_score"] + 0.08 * log1p(popularity)
-        resolved.append({
-            "artist_id": artist_id,
-            "artist_name": spotify_name,
-            "genres": spotify_artist.get("genres", [])[:4],
-            "image_url": images[0]["url"] if images else None,
-            "popularity": popularity,
-            "relevance": round(quality_score, 4),
-            "sample_track": sample.get("name"),
-            "sample_track_id": sample.get("id"),
-            "preview_url": sample.get("preview_url"),
-            "seed_artist": ", ".join(source_names[:2]),
-            "found_via_genre": None,
-            "_primary_seed": source_names[0] if source_names else "",
-        })
+                images = spotify_artist.get("images", [])
+                popularity = int(spotify_artist.get("popularity", 0) or 0)
+                sources = candidate["sources"]
+                source_names = []
+                for source in sources:
+                    if source["artist"] not in source_names:
+                        source_names.append(source["artist"])
+
+                # Similarity dominates; popularity is only a small confidence prior so
+                # the list does not collapse into either stars or metadata ghosts.
+                quality_score = candidate["similarity_score"] + 0.08 * log1p(popularity)
+                resolved.append({
+                    "artist_id": spotify_artist["id"],
+                    "artist_name": spotify_artist.get("name", ""),
+                    "genres": spotify_artist.get("genres", [])[:4],
+                    "image_url": images[0]["url"] if images else None,
+                    "popularity": popularity,
+                    "relevance": round(quality_score, 4),
+                    "sample_track": sample.get("name"),
+                    "sample_track_id": sample.get("id"),
+                    "preview_url": sample.get("preview_url"),
+                    "seed_artist": ", ".join(source_names[:2]),
+                    "found_via_genre": None,
+                    "_primary_seed": source_names[0] if source_names else "",
+                })
 
     resolved.sort(key=lambda artist: artist["relevance"], reverse=True)
 
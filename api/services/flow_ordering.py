@@ -30,21 +30,46 @@ def compute_transition_cost(
     - Tempo difference (ideal: ±10 BPM)
     - Genre continuity bonus
     """
+    overlap = None
+    if track_a_genres and track_b_genres:
+        overlap = len(track_a_genres & track_b_genres)
+    return _transition_cost(
+        _flow_values(track_a_features), _flow_values(track_b_features), overlap
+    )
+
+
+def _flow_values(features: Optional[Dict]) -> Optional[tuple]:
+    """Extract (energy, tempo, valence) with neutral defaults, or None without features."""
+    if not features:
+        return None
+    return (
+        features.get('energy', 0.5),
+        features.get('tempo', 120),
+        features.get('valence', 0.5),
+    )
+
+
+def _transition_cost(
+    values_a: Optional[tuple],
+    values_b: Optional[tuple],
+    overlap: Optional[int],
+) -> float:
+    """Transition cost given the shared genre count, or None if either track has no genres."""
     cost = 0.0
 
     # If no features, use neutral cost
-    if not track_a_features or not track_b_features:
+    if values_a is None or values_b is None:
         # Check genre overlap as fallback
-        if track_a_genres and track_b_genres:
-            overlap = len(track_a_genres & track_b_genres)
+        if overlap is not None:
             if overlap > 0:
                 return 0.3  # Good genre match
             return 0.6  # No genre match
         return 0.5  # Neutral
 
+    energy_a, tempo_a, valence_a = values_a
+    energy_b, tempo_b, valence_b = values_b
+
     # Energy difference (0-1 scale, ideal is small diff)
-    energy_a = track_a_features.get('energy', 0.5)
-    energy_b = track_b_features.get('energy', 0.5)
     energy_diff = abs(energy_a - energy_b)
     # Penalize large jumps (>0.3)
     if energy_diff > 0.3:
@@ -53,8 +78,6 @@ def compute_transition_cost(
         cost += energy_diff * 0.5
 
     # Tempo difference (normalize by typical range)
-    tempo_a = track_a_features.get('tempo', 120)
-    tempo_b = track_b_features.get('tempo', 120)
     tempo_diff = abs(tempo_a - tempo_b)
     # Penalize >20 BPM jumps
     if tempo_diff > 20:
@@ -63,67 +86,113 @@ def compute_transition_cost(
         cost += (tempo_diff / 40) * 0.3
 
     # Valence (mood) difference
-    valence_a = track_a_features.get('valence', 0.5)
-    valence_b = track_b_features.get('valence', 0.5)
     valence_diff = abs(valence_a - valence_b)
     cost += valence_diff * 0.3
 
     # Genre continuity bonus (reduce cost if genres overlap)
-    if track_a_genres and track_b_genres:
-        overlap = len(track_a_genres & track_b_genres)
+    if overlap is not None:
         if overlap > 0:
             cost -= 0.2 * min(overlap, 2)
 
     return max(0, cost)
 
 
+# Upper bound on 2-opt improvement passes; each pass is O(N^2) and
+# playlists normally settle within a handful.
+_TWO_OPT_MAX_PASSES = 20
+
+
 def order_for_smooth_flow(
     tracks: List[Dict],
     features_map: Dict[str, Dict],
     genres_map: Dict[str, set],
 ) -> List[Dict]:
     """
-    Order tracks for smooth flow using greedy nearest-neighbor.
+    Order tracks for smooth flow using greedy nearest-neighbor plus 2-opt.
 
     Starts with the strongest/anchor track supplied by the selector, then picks
-    the lowest transition cost. Deterministic ordering makes the same anchors
-    reproducible and keeps a selected anchor visibly in the lead position.
+    the lowest transition cost. 2-opt then reverses any stretch of the path
+    that lowers the total cost, which untangles the late, forced jumps greedy
+    leaves behind. The first track never moves. Deterministic ordering makes
+    the same anchors reproducible and keeps a selected anchor visibly in the
+    lead position.
     """
     if len(tracks) <= 1:
         return tracks
 
-    remaining = list(tracks)
-    ordered = []
-
-    ordered.append(remaining.pop(0))
+    # Transition cost is symmetric, so each pair is evaluated once up front
+    # and both passes read from the matrix. Genre sets become int bitmasks
+    # so each pair's overlap is an AND and a popcount, not a new set.
+    genre_bits: Dict[str, int] = {}
+    track_values = []
+    track_masks = []
+    for track in tracks:
+        tid = track.get('id', '')
+        track_values.append(_flow_values(features_map.get(tid)))
+        mask = 0
+        for genre in genres_map.get(tid, ()):
+            mask |= genre_bits.setdefault(genre, 1 << len(genre_bits))
+        track_masks.append(mask)
+
+    n = len(tracks)
+    costs = [[0.0] * n for _ in range(n)]
+    for a in range(n):
+        mask_a = track_masks[a]
+        for b in range(a + 1, n):
+            mask_b = track_masks[b]
+            overlap = bin(mask_a & mask_b).count("1") if mask_a and mask_b else None
+            cost = _transition_cost(track_values[a], track_values[b], overlap)
+            costs[a][b] = costs[b][a] = cost
+
+    remaining = list(range(1, n))
+    ordered = [0]
 
     while remaining:
-        last_track = ordered[-1]
-        last_id = last_track.get('id', '')
-        last_features = features_map.get(last_id, {})
-        last_genres = genres_map.get(last_id, set())
+        last_costs = costs[ordered[-1]]
 
-        # Find track with lowest transition cost
+        # Find track with lowest transition cost (first one wins ties)
         best_idx = 0
         best_cost = float('inf')
 
-        for i, candidate in enumerate(remaining):
-            cand_id = candidate.get('id', '')
-            cand_features = features_map.get(cand_id, {})
-            cand_genres = genres_map.get(cand_id, set())
-
-            cost = compute_transition_cost(
-                last_features, cand_features,
-                last_genres, cand_genres
-            )
-
+        for i, cand in enumerate(remaining):
+            cost = last_costs[cand]
             if cost < best_cost:
                 best_cost = cost
                 best_idx = i
 
         ordered.append(remaining.pop(best_idx))
 
-    return ordered
+    _two_opt(ordered, costs)
+    return [tracks[i] for i in ordered]
+
+
+def _two_opt(path: List[int], costs: List[List[float]]) -> None:
+    """
+    Improve an open path in place by reversing segments, keeping path[0] fixed.
+
+    Reversing path[i..j] only changes the edges entering and leaving the
+    segment, because costs are symmetric.
+    """
+    n = len(path)
+    for _ in range(_TWO_OPT_MAX_PASSES):
+        improved = False
+        for i in range(1, n - 1):
+            before = path[i - 1]
+            first = path[i]
+            entry_cost = costs[before][first]
+            for j in range(i + 1, n):
+                last = path[j]
+                delta = costs[before][last] - entry_cost
+                if j + 1 < n:
+                    after = path[j + 1]
+                    delta += costs[first][after] - costs[last][after]
+                if delta < -1e-9:
+                    path[i:j + 1] = path[i:j + 1][::-1]
+                    first = path[i]
+                    entry_cost = costs[before][first]
+                    improved = True
+        if not improved:
+            return
 
 
 def order_for_energy_arc(
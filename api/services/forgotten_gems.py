@@ -1,28 +1,35 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+import heapq
 from datetime import datetime, timedelta
 from math import log
-from ..db import get_all_tracks_with_counts, ContentType
+from ..db import get_all_tracks_with_counts, parse_played_at, ContentType
 from ..spotify_client import enrich_tracks_with_spotify_data
 
 
 def parse_datetime(dt_str: str) -> datetime:
     """Parse datetime string, handling various formats."""
-    dt_str = dt_str.replace("Z", "").replace("+00:00", "")
-    if "." in dt_str:
-        return datetime.fromisoformat(dt_str)
-    return datetime.fromisoformat(dt_str)
+    return parse_played_at(dt_str)
 
 
-def calculate_gem_score(track: Dict, now: datetime) -> float:
+def calculate_gem_score(
+    track: Dict, now: datetime, last_played: Optional[datetime] = None
+) -> float:
     """
     Calculate a "gem score" that balances:
     - How much you played it (love intensity)
     - How long it's been forgotten
     - Bonus for tracks with sustained listening (not one-hit wonders)
+
+    Pass ``last_played`` when the caller has already parsed it.
     """
     play_count = track["play_count"]
-    last_played = parse_datetime(track["last_played"])
-    first_played = parse_datetime(track.get("first_played", track["last_played"]))
+    if last_played is None:
+        last_played = parse_datetime(track["last_played"])
+    first_played_str = track.get("first_played", track["last_played"])
+    if first_played_str == track["last_played"]:
+        first_played = last_played
+    else:
+        first_played = parse_datetime(first_played_str)
     
     days_since = (now - last_played).days
     listening_span = max((last_played - first_played).days, 1)
@@ -56,21 +63,19 @@ def find_forgotten_gems(
     - Time since last play
     - Fetches album art from Spotify
     """
-    tracks = get_all_tracks_with_counts(content_type)
+    tracks = get_all_tracks_with_counts(content_type, min_plays=min_plays)
     now = datetime.utcnow()
     cutoff = now - timedelta(days=months_absent * 30)
     
     gems = []
     for track in tracks.values():
-        if track["play_count"] < min_plays:
-            continue
-        
+        # Parsed once here and reused by the score
         last_played = parse_datetime(track["last_played"])
         if last_played >= cutoff:
             continue
         
         days_since = (now - last_played).days
-        score = calculate_gem_score(track, now)
+        score = calculate_gem_score(track, now, last_played)
         
         gems.append({
             "track_id": track["track_id"],
@@ -82,9 +87,8 @@ def find_forgotten_gems(
             "score": score,
         })
     
-    # Sort by score descending
-    gems.sort(key=lambda x: x["score"], reverse=True)
-    top_gems = gems[:limit]
+    # Highest scores first; only the top `limit` need ordering
+    top_gems = heapq.nlargest(limit, gems, key=lambda x: x["score"])
     
     # Album art is optional: the archive-derived ranking should still work when
     # Spotify credentials are unavailable or temporarily need refreshing.
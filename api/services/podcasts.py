@@ -1,5 +1,5 @@
 from typing import List, Dict
-from ..db import get_top_podcasts, get_podcast_episodes, get_all_tracks_with_counts
+from ..db import get_top_podcasts, get_podcast_episodes, get_all_tracks_with_counts, parse_played_at
 from datetime import datetime
 
 
@@ -70,11 +70,7 @@ def get_podcast_backlog(min_plays: int = 1, limit: int = 20) -> List[Dict]:
 
         # Parse last played date
         try:
-            last_played_str = track["last_played"].replace("Z", "").replace("+00:00", "")
-            if "." in last_played_str:
-                last_played = datetime.fromisoformat(last_played_str)
-            else:
-                last_played = datetime.fromisoformat(last_played_str)
+            last_played = parse_played_at(track["last_played"])
 
             days_since = (now - last_played).days
             if days_since > 7:  # Not played in last week
@@ -1,4 +1,9 @@
-from typing import Optional, List, Dict
+from typing import Callable, Optional, List, Dict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+import copy
+import threading
 import time
 import spotipy
 from spotipy.cache_handler import MemoryCacheHandler
@@ -8,16 +13,71 @@ from .config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REFRESH_TO
 
 # Token cache with expiration tracking
 _token_cache: Dict = {}
+# One client per access token, so calls share its keep-alive HTTP session
+_client_cache: Optional[spotipy.Spotify] = None
+
+# Concurrent batch requests per bulk lookup
+_BULK_WORKERS = 4
+
+# Search and top-track lookups repeat across the playlist builders and the
+# discover page within a session; remember them briefly.
+SEARCH_CACHE_TTL = 300
+SEARCH_CACHE_SIZE = 512
+
+
+def ttl_cache(
+    ttl: float = SEARCH_CACHE_TTL,
+    maxsize: int = SEARCH_CACHE_SIZE,
+    keep: Callable[[object], bool] = bool,
+) -> Callable:
+    """
+    Memoise a lookup per argument tuple for ``ttl`` seconds, least recently
+    used first out beyond ``maxsize`` entries.
+
+    Only results ``keep`` accepts are stored. By default that drops empty
+    results: the wrappers below turn API errors into empty results, and a
+    transient failure should not stick for the whole TTL.
+    Callers get a shallow copy, so sorting or slicing the list is safe.
+    """
+    def decorator(func: Callable) -> Callable:
+        entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = entries.get(key)
+                if entry is not None and entry[0] > now:
+                    entries.move_to_end(key)
+                    return copy.copy(entry[1])
+
+            value = func(*args, **kwargs)
+            if keep(value):
+                with lock:
+                    entries[key] = (now + ttl, value)
+                    entries.move_to_end(key)
+                    while len(entries) > maxsize:
+                        entries.popitem(last=False)
+            return copy.copy(value)
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+
+    return decorator
 
 
 def get_spotify_client() -> spotipy.Spotify:
     """Get authenticated Spotify client with automatic token refresh."""
-    global _token_cache
+    global _token_cache, _client_cache
 
     # Check if we have a valid cached token (with 5 min buffer)
     now = time.time()
     if _token_cache and _token_cache.get("expires_at", 0) > now + 300:
-        return spotipy.Spotify(auth=_token_cache["access_token"])
+        if _client_cache is None:
+            _client_cache = spotipy.Spotify(auth=_token_cache["access_token"])
+        return _client_cache
 
     if not SPOTIFY_CLIENT_ID or not SPOTIFY_REFRESH_TOKEN:
         raise RuntimeError(
@@ -41,28 +101,39 @@ def get_spotify_client() -> spotipy.Spotify:
 
     token = oauth.refresh_access_token(SPOTIFY_REFRESH_TOKEN)
     _token_cache = token
-    return spotipy.Spotify(auth=token["access_token"])
+    _client_cache = spotipy.Spotify(auth=token["access_token"])
+    return _client_cache
 
 
 def get_tracks_bulk(track_ids: List[str]) -> List[Dict]:
-    """Get multiple tracks info with album art (max 50 per call)."""
+    """
+    Get multiple tracks info with album art (max 50 per call).
+
+    Batches are requested concurrently; results keep the input order.
+    """
     sp = get_spotify_client()
-    results = []
     # Filter out None/empty track IDs
     valid_ids = [tid for tid in track_ids if tid]
-    for i in range(0, len(valid_ids), 50):
-        batch = valid_ids[i : i + 50]
+    batches = [valid_ids[i : i + 50] for i in range(0, len(valid_ids), 50)]
+
+    def fetch_batch(batch: List[str]) -> List[Dict]:
         try:
-            response = sp.tracks(batch)
-            results.extend(response.get("tracks", []))
+            return sp.tracks(batch).get("tracks", [])
         except Exception:
-            continue
-    return [t for t in results if t]  # Filter out None results
+            return []
+
+    if len(batches) <= 1:
+        batch_results = [fetch_batch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_BULK_WORKERS, len(batches))) as executor:
+            batch_results = list(executor.map(fetch_batch, batches))
+    return [t for batch in batch_results for t in batch if t]  # Filter out None results
 
 
 def enrich_tracks_with_spotify_data(tracks: List[Dict]) -> List[Dict]:
     """Add Spotify metadata (album art, preview URL) to track list."""
-    track_ids = [t.get("track_id") for t in tracks if t.get("track_id")]
+    # Repeated plays of a track only need one lookup
+    track_ids = list(dict.fromkeys(t.get("track_id") for t in tracks if t.get("track_id")))
     if not track_ids:
         return tracks
     
@@ -93,6 +164,7 @@ def search_tracks_by_artist(artist_name: str, limit: int = 20) -> List[Dict]:
     return results.get("tracks", {}).get("items", [])
 
 
+@ttl_cache()
 def search_tracks_by_genre(genre: str, limit: int = 20) -> List[Dict]:
     """Search for tracks by genre."""
     sp = get_spotify_client()
@@ -110,6 +182,7 @@ def get_artist_related(artist_id: str) -> List[Dict]:
         return []
 
 
+@ttl_cache()
 def get_artist_top_tracks(artist_id: str, market: str = "US") -> List[Dict]:
     """Get top tracks for an artist."""
     sp = get_spotify_client()
@@ -144,6 +217,7 @@ def get_artists_bulk(artist_ids: List[str]) -> List[Dict]:
     return results
 
 
+@ttl_cache()
 def search_artist(name: str) -> Optional[Dict]:
     """Search for an artist by name and return the top result."""
     sp = get_spotify_client()
@@ -162,20 +236,26 @@ def get_audio_features(track_ids: List[str]) -> List[Dict]:
     Note: As of late 2024, Spotify restricted audio_features API access.
     This will return empty results if the app doesn't have Extended Quota Mode.
     The playlist builder handles this gracefully with fallback scoring.
+
+    Batches of 100 are requested concurrently; results keep the input order.
     """
     sp = get_spotify_client()
-    results = []
     valid_ids = [tid for tid in track_ids if tid]
-    for i in range(0, len(valid_ids), 100):
-        batch = valid_ids[i : i + 100]
+    batches = [valid_ids[i : i + 100] for i in range(0, len(valid_ids), 100)]
+
+    def fetch_batch(batch: List[str]) -> List[Dict]:
         try:
-            features = sp.audio_features(batch)
-            if features:
-                results.extend(f for f in features if f)
+            return sp.audio_features(batch) or []
         except Exception:
             # Likely 403 due to Spotify API restrictions
-            pass
-    return results
+            return []
+
+    if len(batches) <= 1:
+        batch_results = [fetch_batch(batch) for batch in batches]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_BULK_WORKERS, len(batches))) as executor:
+            batch_results = list(executor.map(fetch_batch, batches))
+    return [f for batch in batch_results for f in batch if f]
 
 
 def get_recommendations(
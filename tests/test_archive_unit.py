@@ -0,0 +1,121 @@
+"""Deterministic tests for the consolidated archive built from monthly databases."""
+
+import sqlite3
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+from api import db
+
+NOW = datetime.now(timezone.utc).replace(microsecond=0)
+
+
+def days_ago(days):
+    return (NOW - timedelta(days=days)).isoformat()
+
+
+PLAYS = {
+    "history_202401.db": [
+        ("2024-01-02T10:00:00+00:00", "t2", "Song B", "Artist B"),
+        ("2024-01-03T10:00:00+00:00", "t1", "Song A", "Artist A"),
+        ("2024-01-04T10:00:00+00:00", "p1", "Show Intro", "Accidental Tech Podcast"),
+        ("2024-01-05T10:00:00+00:00", "t1", "Song A", "Artist A"),
+        ("2024-01-06T10:00:00+00:00", None, "Radio Ad", "Station"),
+        ("2024-01-07T10:00:00+00:00", "t1", "Song A", "Artist A"),
+    ],
+    "history_202402.db": [
+        (days_ago(20), "t4", "Song D", "Artist D"),
+        (days_ago(4), "t1", "Song A", "Artist A"),
+        (days_ago(3), "t2", "Song B", "Artist B"),
+        (days_ago(2), "t0", "Song Zero", "Artist Zero"),
+        (days_ago(1), "t1", "Song A", "Artist A"),
+        (days_ago(0.5), "p2", "Deep Dive", "Some Podcast Network"),
+    ],
+}
+
+
+class ConsolidatedArchiveTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        data_dir = Path(tmp.name)
+        for name, plays in PLAYS.items():
+            conn = sqlite3.connect(data_dir / name)
+            conn.execute(
+                "CREATE TABLE plays (played_at TEXT, track_id TEXT, track TEXT, "
+                "artist TEXT, genre TEXT, ms_played INTEGER)"
+            )
+            conn.executemany(
+                "INSERT INTO plays VALUES (?, ?, ?, ?, 'rock', 1000)", plays
+            )
+            conn.commit()
+            conn.close()
+
+        dir_patch = patch.object(db, "DATA_DIR", data_dir)
+        dir_patch.start()
+        self.addCleanup(dir_patch.stop)
+        self.reset_archive()
+        self.addCleanup(self.reset_archive)
+
+    @staticmethod
+    def reset_archive():
+        db._paths_cache = (-1.0, [])
+        db._attached_conn.cache_clear()
+        db._track_rows.cache_clear()
+
+    def test_totals_span_every_month(self):
+        tracks = db.get_all_tracks_with_counts()
+
+        self.assertEqual(
+            {"t0": 1, "t1": 5, "t2": 2, "t4": 1, "p1": 1, "p2": 1},
+            {tid: track["play_count"] for tid, track in tracks.items()},
+        )
+        self.assertEqual("2024-01-03T10:00:00+00:00", tracks["t1"]["first_played"])
+        self.assertEqual(days_ago(1), tracks["t1"]["last_played"])
+        self.assertEqual(12, db.get_total_plays())
+        self.assertEqual(2, db.get_total_plays("podcast"))
+
+    def test_top_tracks_rank_across_months(self):
+        self.assertEqual(
+            [("t1", 5), ("t2", 2)],
+            [(row["track_id"], row["play_count"]) for row in db.get_top_tracks(limit=2)],
+        )
+        self.assertEqual(
+            [("t1", 5), ("t2", 2)],
+            [
+                (row["track_id"], row["play_count"])
+                for row in db.get_top_tracks(limit=2, content_type="music")
+            ],
+        )
+
+    def test_track_order_follows_first_month_then_track_id(self):
+        # t0 sorts first by id but is first played in the later month
+        self.assertEqual(
+            ["p1", "t1", "t2", "p2", "t0", "t4"], list(db.get_all_tracks_with_counts())
+        )
+        self.assertEqual(
+            ["t1", "t2", "t0", "t4"], list(db.get_all_tracks_with_counts("music"))
+        )
+        self.assertEqual(["p1", "p2"], list(db.get_all_tracks_with_counts("podcast")))
+
+    def test_track_filters(self):
+        self.assertEqual(["t1", "t2"], list(db.get_all_tracks_with_counts(min_plays=2)))
+        self.assertEqual(
+            ["t1", "t2", "p2", "t0"],
+            list(db.get_all_tracks_with_counts(played_since=days_ago(7))),
+        )
+
+    def test_recent_tracks_report_latest_play(self):
+        recent = db.get_recent_tracks(days=7, limit=10)
+
+        self.assertEqual(
+            [("t1", days_ago(1), 2), ("t0", days_ago(2), 1), ("t2", days_ago(3), 1)],
+            [(row["track_id"], row["last_played"], row["play_count"]) for row in recent],
+        )
+        self.assertEqual(["t1"], [row["track_id"] for row in db.get_recent_tracks(days=7, limit=1)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+"""Deterministic tests for the ETag / If-None-Match middleware."""
+
+import unittest
+
+from fastapi import FastAPI, Response
+from fastapi.testclient import TestClient
+
+from api.main import etag_responses
+
+
+def build_client():
+    app = FastAPI()
+    app.middleware("http")(etag_responses)
+
+    @app.get("/api/stats/example")
+    def stats_example():
+        response = Response(content=b'{"plays": 3}', media_type="application/json")
+        response.headers.append("set-cookie", "first=1")
+        response.headers.append("set-cookie", "second=2")
+        response.headers.append("vary", "Accept")
+        response.headers.append("vary", "Origin")
+        return response
+
+    @app.get("/api/other")
+    def other():
+        return {"plays": 3}
+
+    return TestClient(app)
+
+
+class EtagMiddlewareTests(unittest.TestCase):
+    def setUp(self):
+        self.client = build_client()
+
+    def test_tags_response_and_keeps_repeated_headers(self):
+        response = self.client.get("/api/stats/example")
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'{"plays": 3}', response.content)
+        self.assertTrue(response.headers["etag"].startswith('W/"'))
+        self.assertEqual(
+            ["first=1", "second=2"], response.headers.get_list("set-cookie")
+        )
+        self.assertEqual(["Accept", "Origin"], response.headers.get_list("vary"))
+
+    def test_matching_if_none_match_returns_304(self):
+        etag = self.client.get("/api/stats/example").headers["etag"]
+
+        response = self.client.get(
+            "/api/stats/example", headers={"If-None-Match": etag}
+        )
+
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual(etag, response.headers["etag"])
+        self.assertNotIn("content-length", response.headers)
+        self.assertEqual(
+            ["first=1", "second=2"], response.headers.get_list("set-cookie")
+        )
+        self.assertEqual(["Accept", "Origin"], response.headers.get_list("vary"))
+
+    def test_non_matching_if_none_match_returns_full_body(self):
+        response = self.client.get(
+            "/api/stats/example", headers={"If-None-Match": 'W/"0000000000000000"'}
+        )
+
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'{"plays": 3}', response.content)
+        self.assertNotEqual('W/"0000000000000000"', response.headers["etag"])
+
+    def test_if_none_match_compares_whole_tags(self):
+        etag = self.client.get("/api/stats/example").headers["etag"]
+        strong = etag.removeprefix("W/")
+
+        for header in (
+            f'W/"0000000000000000", {etag}',
+            f'"0000000000000000",{strong}',
+            strong,
+            "*",
+        ):
+            with self.subTest(header=header):
+                response = self.client.get(
+                    "/api/stats/example", headers={"If-None-Match": header}
+                )
+                self.assertEqual(304, response.status_code)
+
+        for header in (f"{etag}-gzip", f'W/"x{strong[1:]}', strong[:-2] + '"'):
+            with self.subTest(header=header):
+                response = self.client.get(
+                    "/api/stats/example", headers={"If-None-Match": header}
+                )
+                self.assertEqual(200, response.status_code)
+                self.assertEqual(b'{"plays": 3}', response.content)
+
+    def test_untagged_paths_pass_through(self):
+        response = self.client.get("/api/other")
+
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn("etag", response.headers)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Deterministic tests for the Spotify lookup TTL cache."""
+
+import unittest
+from unittest.mock import patch
+
+from api import spotify_client
+from api.spotify_client import ttl_cache
+
+
+class SpotifyTtlCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        clock_patch = patch.object(spotify_client.time, "monotonic", lambda: self.now)
+        clock_patch.start()
+        self.addCleanup(clock_patch.stop)
+        self.calls = []
+
+    def cached(self, **options):
+        @ttl_cache(**options)
+        def lookup(name, limit=2):
+            self.calls.append((name, limit))
+            return [{"name": name}] * limit if name else []
+
+        return lookup
+
+    def test_repeat_lookup_is_served_from_cache_until_ttl(self):
+        lookup = self.cached(ttl=60)
+
+        lookup("indie")
+        lookup("indie")
+        self.now += 59
+        lookup("indie")
+        self.assertEqual([("indie", 2)], self.calls)
+
+        self.now += 1
+        lookup("indie")
+        self.assertEqual([("indie", 2), ("indie", 2)], self.calls)
+
+    def test_arguments_are_part_of_the_key(self):
+        lookup = self.cached()
+
+        lookup("indie")
+        lookup("indie", limit=3)
+        lookup("folk")
+
+        self.assertEqual([("indie", 2), ("indie", 3), ("folk", 2)], self.calls)
+
+    def test_empty_results_are_not_cached(self):
+        lookup = self.cached()
+
+        self.assertEqual([], lookup(""))
+        self.assertEqual([], lookup(""))
+
+        self.assertEqual([("", 2), ("", 2)], self.calls)
+
+    def test_keep_predicate_decides_what_is_cached(self):
+        lookup = self.cached(keep=lambda value: len(value) > 2)
+
+        lookup("indie")
+        lookup("indie")
+        lookup("folk", limit=3)
+        lookup("folk", limit=3)
+
+        self.assertEqual([("indie", 2), ("indie", 2), ("folk", 3)], self.calls)
+
+    def test_callers_get_copies(self):
+        lookup = self.cached()
+
+        first = lookup("indie")
+        first.append({"name": "mutated"})
+        first.sort(key=lambda item: item["name"], reverse=True)
+        second = lookup("indie")
+
+        self.assertEqual([{"name": "indie"}, {"name": "indie"}], second)
+        self.assertIsNot(first, second)
+        self.assertEqual(1, len(self.calls))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lookup = self.cached(maxsize=2)
+
+        lookup("a")
+        lookup("b")
+        lookup("a")  # refreshes "a", leaving "b" least recently used
+        lookup("c")
+        self.calls.clear()
+
+        lookup("a")
+        lookup("c")
+        self.assertEqual([], self.calls)
+        lookup("b")
+        self.assertEqual([("b", 2)], self.calls)
+
+    def test_cache_clear_forgets_entries(self):
+        lookup = self.cached()
+
+        lookup("indie")
+        lookup.cache_clear()
+        lookup("indie")
+
+        self.assertEqual(2, len(self.calls))
+
+
+if __name__ == "__main__":
+    unittest.main()
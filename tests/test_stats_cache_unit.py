@@ -0,0 +1,76 @@
+"""Deterministic tests for the archive-versioned stats response cache."""
+
+import unittest
+from unittest.mock import patch
+
+from api import main
+from api.main import STATS_CACHE_TTL, cached_stats
+
+
+class StatsCacheTests(unittest.TestCase):
+    def setUp(self):
+        main._stats_cache.clear()
+        self.addCleanup(main._stats_cache.clear)
+        self.version = "v1"
+        self.now = 1000.0
+        self.calls = []
+
+        version_patch = patch.object(main, "get_archive_version", lambda: self.version)
+        clock_patch = patch.object(main.time, "monotonic", lambda: self.now)
+        version_patch.start()
+        clock_patch.start()
+        self.addCleanup(version_patch.stop)
+        self.addCleanup(clock_patch.stop)
+
+        @cached_stats
+        def stats_example(content_type="all"):
+            self.calls.append(content_type)
+            return {"content_type": content_type, "call": len(self.calls)}
+
+        self.endpoint = stats_example
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.endpoint(content_type="music")
+        self.now += STATS_CACHE_TTL - 1
+        second = self.endpoint(content_type="music")
+
+        self.assertIs(first, second)
+        self.assertEqual(["music"], self.calls)
+
+    def test_arguments_are_part_of_the_key(self):
+        self.endpoint(content_type="music")
+        self.endpoint(content_type="podcast")
+
+        self.assertEqual(["music", "podcast"], self.calls)
+
+    def test_archive_version_bump_misses(self):
+        first = self.endpoint()
+        self.version = "v2"
+        second = self.endpoint()
+
+        self.assertEqual(1, first["call"])
+        self.assertEqual(2, second["call"])
+
+    def test_entry_expires_after_ttl(self):
+        self.endpoint()
+        self.now += STATS_CACHE_TTL
+        refreshed = self.endpoint()
+        again = self.endpoint()
+
+        self.assertEqual(2, refreshed["call"])
+        self.assertIs(refreshed, again)
+
+    def test_overflow_clears_the_cache(self):
+        for index in range(main._STATS_CACHE_MAX_ENTRIES):
+            self.endpoint(content_type=f"type-{index}")
+        self.assertEqual(main._STATS_CACHE_MAX_ENTRIES, len(main._stats_cache))
+
+        self.endpoint(content_type="one-more")
+
+        self.assertEqual(1, len(main._stats_cache))
+        self.endpoint(content_type="type-0")
+        self.assertEqual("type-0", self.calls[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+"""Deterministic tests for archive track search across its FTS and LIKE paths."""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from api import db
+
+PLAYS = {
+    "history_202401.db": [
+        ("2024-01-03T10:00:00+00:00", "t1", "Paranoid Android", "Radiohead"),
+        ("2024-01-04T10:00:00+00:00", "t1", "Paranoid Android", "Radiohead"),
+        ("2024-01-05T10:00:00+00:00", "t2", 'Say "Hi" Again', "Quoted Band"),
+        ("2024-01-06T10:00:00+00:00", "t3", "Ab Initio", "Abba Tribute"),
+        ("2024-01-07T10:00:00+00:00", None, "Radio Ad", "Station"),
+    ],
+    "history_202402.db": [
+        ("2024-02-01T10:00:00+00:00", "t1", "Paranoid Android", "Radiohead"),
+        ("2024-02-02T10:00:00+00:00", "t4", "Idioteque", "RADIOHEAD"),
+        ("2024-02-03T10:00:00+00:00", "t5", "Cab Ride", "Taxi Driver"),
+        ("2024-02-04T10:00:00+00:00", "t6", "Quiet", 'The "Quiet" Ones'),
+    ],
+}
+
+QUERIES = ["ab", "Ab", "ra", "rad", "RADIO", "radiohead", "android", "zzz",
+           '"', 'y "', '"hi"', 'say "hi" again', '"quiet"']
+
+
+class TrackSearchTests(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        data_dir = Path(tmp.name)
+        for name, plays in PLAYS.items():
+            conn = sqlite3.connect(data_dir / name)
+            conn.execute(
+                "CREATE TABLE plays (played_at TEXT, track_id TEXT, track TEXT, "
+                "artist TEXT, genre TEXT, ms_played INTEGER)"
+            )
+            conn.executemany(
+                "INSERT INTO plays VALUES (?, ?, ?, ?, 'rock', 1000)", plays
+            )
+            conn.commit()
+            conn.close()
+
+        dir_patch = patch.object(db, "DATA_DIR", data_dir)
+        dir_patch.start()
+        self.addCleanup(dir_patch.stop)
+        self.reset_archive()
+        self.addCleanup(self.reset_archive)
+
+    @staticmethod
+    def reset_archive():
+        db._paths_cache = (-1.0, [])
+        db._attached_conn.cache_clear()
+
+    def search_all(self):
+        return {
+            query: {row["track_id"]: row["play_count"] for row in db.search_user_tracks(query, limit=50)}
+            for query in QUERIES
+        }
+
+    @staticmethod
+    def has_search_index():
+        with db._archive() as conn:
+            return conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'plays_fts'"
+            ).fetchone() is not None
+
+    def test_fts_and_like_paths_agree(self):
+        if not self.has_search_index():
+            self.skipTest("SQLite build lacks FTS5 trigram support")
+        indexed = self.search_all()
+
+        self.reset_archive()
+        with patch.object(db, "_build_search_index", lambda conn: None):
+            self.assertFalse(self.has_search_index())
+            scanned = self.search_all()
+
+        self.assertEqual(scanned, indexed)
+
+    def test_matches_track_and_artist_case_insensitively(self):
+        results = self.search_all()
+
+        self.assertEqual({"t1": 3, "t4": 1}, results["radiohead"])
+        self.assertEqual({"t1": 3, "t4": 1}, results["RADIO"])
+        self.assertEqual({"t3": 1, "t5": 1}, results["ab"])
+        self.assertEqual({}, results["zzz"])
+
+    def test_queries_with_double_quotes(self):
+        results = self.search_all()
+
+        self.assertEqual({"t2": 1, "t6": 1}, results['"'])
+        self.assertEqual({"t2": 1}, results['y "'])
+        self.assertEqual({"t2": 1}, results['"hi"'])
+        self.assertEqual({"t2": 1}, results['say "hi" again'])
+        self.assertEqual({"t6": 1}, results['"quiet"'])
+
+    def test_results_are_ranked_by_play_count_and_limited(self):
+        rows = db.search_user_tracks("radiohead", limit=1)
+
+        self.assertEqual(1, len(rows))
+        self.assertEqual("t1", rows[0]["track_id"])
+        self.assertEqual(3, rows[0]["play_count"])
+
+
+if __name__ == "__main__":
+    unittest.main()